@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks._timing
+~~~~~~~~~~~~~~~~~~
+
+Timing helper shared by the benchmarks.
+
+:license: MIT and BSD
+"""
+
+from __future__ import division
+
+import timeit
+
+
+def mean_time(func, min_time=0.2):
+    """Return the mean time, in seconds, of one call to `func`.
+
+    The number of calls doubles until they take at least `min_time`
+    seconds in all.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            return elapsed / number
+        number *= 2
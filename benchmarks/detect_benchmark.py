@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.detect_benchmark
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Latency, throughput and accuracy of
+:func:`indic_transliteration.detect.detect`.
+
+A small Harvard-Kyoto seed corpus is transliterated with
+:mod:`~indic_transliteration.sanscript` into every scheme that ``detect``
+knows about. The benchmark then reports:
+
+- the time per ``detect`` call and the throughput for inputs of growing size,
+- the accuracy of ``detect`` on prefixes of growing length, starting at
+  every word of the corpus. Use it to pick the sample length for
+  :data:`~indic_transliteration.sanscript.AUTO_SAMPLE_LENGTH`.
+
+Run it from the repository root::
+
+    PYTHONPATH=. python benchmarks/detect_benchmark.py
+    PYTHONPATH=. python benchmarks/detect_benchmark.py --plot accuracy.png
+
+Plotting needs matplotlib; everything else only needs this package.
+
+:license: MIT and BSD
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+import argparse
+
+from indic_transliteration import sanscript
+from indic_transliteration.detect import detect, Scheme
+
+from _timing import mean_time
+
+#: Seed corpus, in Harvard-Kyoto.
+SEED = """
+dharmakSetre kurukSetre samavetA yuyutsavaH |
+mAmakAH pANDavAz caiva kim akurvata saMjaya ||
+dRSTvA tu pANDavAnIkaM vyUDhaM duryodhanas tadA |
+AcAryam upasaMgamya rAjA vacanam abravIt ||
+pazyaitAM pANDuputrANAm AcArya mahatIM camUm |
+vyUDhAM drupadaputreNa tava ziSyeNa dhImatA ||
+yogazcittavRttinirodhaH | tadA draSTuH svarUpe 'vasthAnam ||
+"""
+
+#: sanscript schemes paired with the label that ``detect`` should return.
+SCHEMES = [
+    (sanscript.BENGALI, Scheme.Bengali),
+    (sanscript.DEVANAGARI, Scheme.Devanagari),
+    (sanscript.GUJARATI, Scheme.Gujarati),
+    (sanscript.GURMUKHI, Scheme.Gurmukhi),
+    (sanscript.KANNADA, Scheme.Kannada),
+    (sanscript.MALAYALAM, Scheme.Malayalam),
+    (sanscript.ORIYA, Scheme.Oriya),
+    (sanscript.TAMIL, Scheme.Tamil),
+    (sanscript.TELUGU, Scheme.Telugu),
+    (sanscript.HK, Scheme.HK),
+    (sanscript.IAST, Scheme.IAST),
+    (sanscript.ITRANS, Scheme.ITRANS),
+    (sanscript.SLP1, Scheme.SLP1),
+]
+
+#: Input sizes, in characters, for the latency benchmark.
+SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+
+#: Prefix lengths, in characters, for the accuracy benchmark.
+PREFIXES = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+
+
+def corpus(scheme, size=None):
+    """Return the seed corpus in `scheme`, repeated to `size` characters."""
+    text = sanscript.transliterate(' '.join(SEED.split()), sanscript.HK,
+                                   scheme)
+    if size is None:
+        return text
+    n = len(text) + 1
+    return (text + ' ') * (size // n) + text[:size % n]
+
+
+def latency(sizes=SIZES):
+    """Yield ``(label, size, seconds per call, characters per second)``."""
+    for scheme, label in SCHEMES:
+        for size in sizes:
+            text = corpus(scheme, size)
+            seconds = mean_time(lambda: detect(text))
+            yield label, size, seconds, size / seconds
+
+
+def accuracy(prefixes=PREFIXES):
+    """Yield ``(label, prefix length, accuracy)``.
+
+    Samples start at every word of the corpus, wrapping around its end.
+    """
+    for scheme, label in SCHEMES:
+        text = corpus(scheme)
+        starts = [0] + [i + 1 for i, c in enumerate(text) if c == ' ']
+        text = text + ' ' + text * (max(prefixes) // len(text) + 1)
+        for n in prefixes:
+            hits = sum(1 for i in starts if detect(text[i:i + n]) == label)
+            yield label, n, hits / len(starts)
+
+
+def plot(results, path):
+    """Plot accuracy against prefix length for each scheme into `path`."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot
+
+    series = {}
+    for label, n, ratio in results:
+        series.setdefault(label, []).append((n, ratio))
+    for label, points in sorted(series.items()):
+        pyplot.plot([n for n, _ in points], [r for _, r in points],
+                    label=label)
+    pyplot.xscale('log', base=2)
+    pyplot.xlabel('prefix length (characters)')
+    pyplot.ylabel('accuracy')
+    pyplot.legend(fontsize='small', ncol=2)
+    pyplot.savefig(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--max-size', type=int, default=max(SIZES),
+                        help='largest input size for the latency benchmark')
+    parser.add_argument('--plot', metavar='PATH',
+                        help='also plot accuracy against prefix length')
+    args = parser.parse_args(argv)
+
+    print('%-12s %10s %14s %16s' % ('scheme', 'chars', 'us/call', 'chars/s'))
+    for label, size, seconds, rate in latency(
+            [s for s in SIZES if s <= args.max_size]):
+        print('%-12s %10d %14.2f %16.0f' % (label, size, seconds * 1e6, rate))
+
+    results = list(accuracy())
+    print()
+    print('%-12s' % 'scheme' + ''.join('%7d' % n for n in PREFIXES))
+    for i in range(0, len(results), len(PREFIXES)):
+        row = results[i:i + len(PREFIXES)]
+        print('%-12s' % row[0][0] + ''.join('%7.2f' % r for _, _, r in row))
+
+    if args.plot:
+        plot(results, args.plot)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.iscii_benchmark
+~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Throughput of :meth:`indic_transliteration.iscii2utf8.Parser.iscii2utf8`
+across chunk sizes.
+
+A synthetic ISCII corpus covers every script and ATR switches between
+them, along with EXT, INV, nukta and halant sequences, dandas, digits and
+a little noise. The benchmark feeds it to the parser in chunks of growing
+size and reports the throughput for each. It also checks that the output
+is the same for every chunk size, and for random splits, which is what
+:data:`~indic_transliteration.iscii2utf8.chunk_size` and the fast paths
+must preserve.
+
+Run it from the repository root::
+
+    PYTHONPATH=. python benchmarks/iscii_benchmark.py
+    PYTHONPATH=. python benchmarks/iscii_benchmark.py --size 1000000
+
+:license: MIT and BSD
+"""
+
+from __future__ import division, print_function
+
+import argparse
+import random
+
+from indic_transliteration import iscii2utf8
+
+from _timing import mean_time
+
+#: Chunk sizes, in bytes, for the throughput benchmark. `None` is the whole
+#: input in one call.
+CHUNK_SIZES = [16, 256, 4096, 65536, 1 << 20, None]
+
+#: ATR codes of the nine scripts.
+ATR_CODES = [0x42, 0x43, 0x44, 0x45, 0x47, 0x48, 0x49, 0x4A, 0x4B]
+
+CONSONANTS = range(0xB3, 0xD9)
+VOWELS = range(0xA4, 0xB3)
+MARKS = range(0xDA, 0xE8)
+DIGITS = range(0xF1, 0xFB)
+
+
+def _valid(script, chars):
+    """Return the bytes in `chars` that are valid in `script` (1-9)."""
+    iscii2utf8.load_script(script - 1)
+    base = (script - 1) << 8
+    return [ch for ch in chars if not iscii2utf8.invalid_table[base + ch]]
+
+
+def _syllable(rnd, script):
+    """Return the bytes of one syllable in `script` (1-9)."""
+    consonants = _valid(script, CONSONANTS)
+    out = [rnd.choice(consonants)]
+    r = rnd.random()
+    if r < 0.1:
+        out.append(iscii2utf8.ISCII_NUKTA)
+    elif r < 0.25:
+        out += [iscii2utf8.ISCII_HALANT, rnd.choice(consonants)]
+    elif r < 0.28:
+        # halant halant and halant nukta: explicit and soft halant
+        out += [iscii2utf8.ISCII_HALANT,
+                rnd.choice([iscii2utf8.ISCII_HALANT, iscii2utf8.ISCII_NUKTA]),
+                rnd.choice(consonants)]
+    if rnd.random() < 0.5:
+        out.append(rnd.choice(_valid(script, MARKS)))
+    return out
+
+
+def _word(rnd, script):
+    """Return the bytes of one word in `script` (1-9)."""
+    r = rnd.random()
+    if r < 0.05:
+        return [rnd.choice(_valid(script, DIGITS))
+                for _ in range(rnd.randint(1, 4))]
+    if r < 0.07:
+        return [iscii2utf8.ISCII_EXT, rnd.choice([0xBF, 0xB5, 0xB8])]
+    if r < 0.09:
+        return [iscii2utf8.ISCII_INV, rnd.choice(_valid(script, MARKS))]
+    out = []
+    if rnd.random() < 0.2:
+        out.append(rnd.choice(_valid(script, VOWELS)))
+    for _ in range(rnd.randint(1, 4)):
+        out += _syllable(rnd, script)
+    return out
+
+
+def generate(size, seed=0, noise=0.001):
+    """Return about `size` bytes of synthetic ISCII.
+
+    Each line switches to a random script with an ATR; a fraction `noise`
+    of the bytes are random.
+    """
+    rnd = random.Random(seed)
+    out = bytearray()
+    while len(out) < size:
+        code = rnd.choice(ATR_CODES)
+        script = iscii2utf8.ISCII_SCRIPTS[code] + 1
+        out += bytes([iscii2utf8.ISCII_ATR, code])
+        for _ in range(rnd.randint(3, 15)):
+            out += bytes(_word(rnd, script))
+            r = rnd.random()
+            if r < 0.1:
+                out += bytes([iscii2utf8.ISCII_DANDA] * rnd.randint(1, 2))
+            if rnd.random() < noise * 10:
+                out.append(rnd.randrange(256))
+            out.append(0x20)
+        out[-1] = 0x0A
+    return bytes(out[:size])
+
+
+def convert(data, chunk_size=None, script=1):
+    """Convert `data` in chunks of `chunk_size` bytes and return the text."""
+    parser = iscii2utf8.Parser()
+    parser.set_script(script)
+    if chunk_size is None:
+        chunk_size = len(data) or 1
+    out = []
+    for i in range(0, len(data), chunk_size):
+        parser.iscii2utf8(data[i:i + chunk_size])
+        out.append(parser.read_output())
+    parser.iscii2utf8(b'', 1)
+    out.append(parser.read_output())
+    return ''.join(out)
+
+
+def check_splits(data, splits=100, seed=0):
+    """Return the chunk sizes and random splits whose output differs from
+    converting `data` in one call."""
+    expected = convert(data)
+    bad = [n for n in CHUNK_SIZES if convert(data, n) != expected]
+    rnd = random.Random(seed)
+    for _ in range(splits):
+        cuts = sorted(rnd.randrange(len(data) + 1) for _ in range(3))
+        parser = iscii2utf8.Parser()
+        parser.set_script(1)
+        out = []
+        for start, end in zip([0] + cuts, cuts + [len(data)]):
+            parser.iscii2utf8(data[start:end])
+            out.append(parser.read_output())
+        parser.iscii2utf8(b'', 1)
+        out.append(parser.read_output())
+        if ''.join(out) != expected:
+            bad.append(tuple(cuts))
+    return bad
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--size', type=int, default=1 << 22,
+                        help='size of the synthetic input, in bytes')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the synthetic input')
+    args = parser.parse_args(argv)
+
+    data = generate(args.size, args.seed)
+
+    print('%-10s %14s' % ('chunk', 'MB/s'))
+    for n in CHUNK_SIZES:
+        seconds = mean_time(lambda: convert(data, n))
+        print('%-10s %14.2f' % (n or 'all', len(data) / seconds / 1e6))
+
+    bad = check_splits(data[:1 << 16])
+    print()
+    print('chunk splits: %s' % ('ok' if not bad else 'DIFFERENT %s' % bad))
+    return 1 if bad else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.little_benchmark
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Throughput of
+:func:`indic_transliteration.little.transliterator.transliterate`.
+
+A small ITRANS seed corpus is repeated to inputs of growing size and
+transliterated to Devanagari, and back. ITRANS has the longest
+multi-character keys of the built-in schemes, so it is the one that
+exercises the search for the next key the most.
+
+The search for the next key is also timed on its own, against the
+recursive search that the trie walk in ``_getNextChar`` replaced, which
+is kept here as a reference.
+
+Run it from the repository root::
+
+    PYTHONPATH=. python benchmarks/little_benchmark.py
+    PYTHONPATH=. python benchmarks/little_benchmark.py --max-size 10000
+
+:license: MIT and BSD
+"""
+
+from __future__ import division, print_function
+
+import argparse
+
+from indic_transliteration.little import transliterator
+
+from _timing import mean_time
+
+#: Seed corpus, in ITRANS.
+SEED = """
+dharmakShetre kurukShetre samavetA yuyutsavaH .
+mAmakAH pANDavAshchaiva kimakurvata sa~njaya ..
+dRRiShTvA tu pANDavAnIkaM vyUDhaM duryodhanastadA .
+AchAryamupasa~Ngamya rAjA vachanamabravIt ..
+yogashchittavRRittinirodhaH . tadA draShTuH svarUpe.avasthAnam ..
+"""
+
+#: ``(input format, output format)`` pairs to benchmark.
+PAIRS = [
+    ('ITRANS', 'DEVANAGARI'),
+    ('DEVANAGARI', 'ITRANS'),
+]
+
+#: Input sizes, in characters.
+SIZES = [100, 1000, 10000, 100000]
+
+
+def corpus(fmt, size):
+    """Return the seed corpus in `fmt`, repeated to about `size` characters."""
+    text = ' '.join(SEED.split())
+    if fmt != 'ITRANS':
+        text = transliterator.transliterate(text, 'ITRANS',
+                                            fmt).decode('utf-8')
+    return (text + ' ') * (size // (len(text) + 1) + 1)
+
+
+def old_parse_tree(scheme):
+    """Return the search tree of the old key search for `scheme`.
+
+    It is the scheme's trie without the marks of where keys end.
+    """
+    def strip(node):
+        return dict((c, strip(child)) for c, child in node.items() if c)
+    return strip(scheme._trie)
+
+
+def old_next_char(tree, text, startPos):
+    """Return the key at startPos the way the old recursive search did."""
+    i = startPos
+    matched = text[i]
+    if i < len(text) - 1:
+        try:
+            if text[i + 1] in tree[text[i]]:
+                matched = matched + old_next_char(tree[text[i]], text, i + 1)
+        except KeyError:
+            pass
+    return matched
+
+
+def tokenize(nextChar, text):
+    """Split `text` into keys with `nextChar`."""
+    i = 0
+    while i < len(text):
+        i = i + len(nextChar(text, i))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--max-size', type=int, default=max(SIZES),
+                        help='largest input size')
+    args = parser.parse_args(argv)
+
+    print('%-24s %10s %14s %14s' % ('formats', 'chars', 'ms/call', 'chars/s'))
+    for inFormat, outFormat in PAIRS:
+        for size in [s for s in SIZES if s <= args.max_size]:
+            text = corpus(inFormat, size)
+            seconds = mean_time(lambda: transliterator.transliterate(
+                text, inFormat, outFormat))
+            print('%-24s %10d %14.3f %14.0f' % (
+                inFormat + ' > ' + outFormat, len(text), seconds * 1e3,
+                len(text) / seconds))
+
+    scheme = transliterator._names['ITRANS']
+    tree = old_parse_tree(scheme)
+
+    def oldNextChar(text, startPos):
+        if text[startPos].isspace():
+            return text[startPos]
+        return old_next_char(tree, text, startPos)
+
+    print()
+    print('%-24s %10s %14s %14s' % ('ITRANS key search', 'chars',
+                                    'trie ms', 'recursive ms'))
+    for size in [s for s in SIZES if s <= args.max_size]:
+        text = scheme._preprocess(corpus('ITRANS', size))
+        new = mean_time(lambda: tokenize(scheme._getNextChar, text))
+        old = mean_time(lambda: tokenize(oldNextChar, text))
+        print('%-24s %10d %14.3f %14.3f' % ('', len(text), new * 1e3,
+                                            old * 1e3))
+
+
+if __name__ == '__main__':
+    main()
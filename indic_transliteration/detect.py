@@ -8,10 +8,12 @@
     :license: MIT and BSD
 """
 
+import codecs
 import re
+import sys
+import unicodedata
 
 #: Scheme data. This is split into separate classes, but here it's DRY.
-import sys
 
 SCHEMES = [
     ('Bengali', 0x0980),
@@ -40,9 +42,38 @@ BRAHMIC_LAST_CODE_POINT = 0x0d7f
 #: Schemes sorted by Unicode code point. Ignore schemes with none defined.
 BLOCKS = sorted([x for x in SCHEMES if x[-1]], key=lambda x: -x[1])
 
+#: Brahmic scheme names indexed by ``(code - BRAHMIC_FIRST_CODE_POINT) >> 7``.
+#: Every Brahmic block is 128 code points long.
+BLOCK_NAMES = [name for name, code in sorted(BLOCKS, key=lambda x: x[1])]
+
+#: Danda and double danda live in the Devanagari block but are shared by
+#: every Brahmic script, so they carry no evidence about the scheme.
+DANDAS = (0x0964, 0x0965)
+
+#: Marker for runs of Roman characters in :func:`segment`.
+_ROMAN = object()
+
 #: Enum for Sanskrit schemes.
 Scheme = type('Enum', (), {name : name for name, code in SCHEMES})
 
+#: Number of leading bytes that :func:`detect_encoding` inspects.
+ENCODING_SAMPLE_SIZE = 4096
+
+#: Scripts selected by the byte that follows an ISCII attribute (ATR) code.
+#: Assamese (0x46) is written in the Bengali script.
+ISCII_ATR_SCHEMES = {
+    0x42: Scheme.Devanagari,
+    0x43: Scheme.Bengali,
+    0x44: Scheme.Tamil,
+    0x45: Scheme.Telugu,
+    0x46: Scheme.Bengali,
+    0x47: Scheme.Oriya,
+    0x48: Scheme.Kannada,
+    0x49: Scheme.Malayalam,
+    0x4A: Scheme.Gujarati,
+    0x4B: Scheme.Gurmukhi,
+}
+
 
 class Regex:
 
@@ -67,29 +98,48 @@ class Regex:
     #: Match on Velthuis-only characters
     VELTHUIS_ONLY = re.compile(u'\\.[mhnrlntds]|"n|~s')
 
+    #: Match on bytes outside of ASCII
+    HIGH_BYTE = re.compile(b'[\x80-\xff]')
 
-def detect(text):
-    """Detect the input's transliteration scheme.
+    #: Match on high bytes that ISCII never uses
+    NOT_ISCII = re.compile(b'[\x80-\xa0\xfb-\xff]')
 
-    :param text: some text data, either a `unicode` or a `str` encoded
-                 in UTF-8.
-    """
+    #: Match on an ISCII script switch: ATR followed by a script code
+    ISCII_ATR = re.compile(b'\xef([\x42-\x4b])')
+
+
+def _decode(text):
     if sys.version_info < (3, 0):
       # Verify encoding
       try:
           text = text.decode('utf-8')
       except UnicodeError:
           pass
+    return text
+
+
+def detect(text):
+    """Detect the input's transliteration scheme.
+
+    :param text: some text data, either a `unicode` or a `str` encoded
+                 in UTF-8.
+    """
+    text = _decode(text)
 
     # Brahmic schemes are all within a specific range of code points.
+    # Dandas are also used with romanizations, so they don't count.
     for L in text:
         code = ord(L)
-        if code >= BRAHMIC_FIRST_CODE_POINT:
+        if code >= BRAHMIC_FIRST_CODE_POINT and code not in DANDAS:
             for name, start_code in BLOCKS:
                 if start_code <= code <= BRAHMIC_LAST_CODE_POINT:
                     return name
 
-    # Romanizations
+    return _detect_roman(text)
+
+
+def _detect_roman(text):
+    """Detect the romanization of `text`, which has no Brahmic characters."""
     if Regex.IAST_OR_KOLKATA_ONLY.search(text):
         if Regex.KOLKATA_ONLY.search(text):
             return Scheme.Kolkata
@@ -109,3 +159,113 @@ def detect(text):
         return Scheme.ITRANS
 
     return Scheme.HK
+
+
+def segment(text):
+    """Split mixed-script text into runs that share a transliteration scheme.
+
+    Brahmic runs are labelled by their Unicode block and runs of Latin
+    letters by the same evidence that :func:`detect` uses::
+
+        segment('iti राम') == [(0, 3, Scheme.HK), (3, 7, Scheme.Devanagari)]
+
+    Letters of other scripts, such as Greek or Cyrillic, form runs labelled
+    ``None``. Characters that carry no evidence -- whitespace, digits
+    (Brahmic digits too), punctuation and dandas -- belong to the run that
+    follows them, or to the last run at the end of the text; text with
+    nothing else is labelled by :func:`detect`. Combining marks, as in
+    decomposed IAST, belong to the run of the letter before them. The text
+    is scanned once.
+
+    :param text: some text data, either a `unicode` or a `str` encoded
+                 in UTF-8.
+    :returns: a list of ``(start, end, scheme)`` tuples that covers `text`
+              in order. Empty text gives an empty list.
+    """
+    text = _decode(text)
+    if not text:
+        return []
+
+    spans = []
+    start = 0
+    # End of the last character that carried evidence for the current run.
+    boundary = 0
+    kind = False
+    for i, L in enumerate(text):
+        code = ord(L)
+        if BRAHMIC_FIRST_CODE_POINT <= code <= BRAHMIC_LAST_CODE_POINT:
+            if code in DANDAS or unicodedata.category(L) == 'Nd':
+                continue
+            current = BLOCK_NAMES[(code - BRAHMIC_FIRST_CODE_POINT) >> 7]
+        elif L.isalpha():
+            if unicodedata.name(L, '').startswith('LATIN '):
+                current = _ROMAN
+            else:
+                current = None
+        elif kind is not False and unicodedata.category(L).startswith('M'):
+            boundary = i + 1
+            continue
+        else:
+            continue
+
+        if current != kind:
+            if kind is not False:
+                spans.append((start, boundary, kind))
+                start = boundary
+            kind = current
+        boundary = i + 1
+
+    if kind is False:
+        # Nothing but neutral characters, such as digits.
+        return [(0, len(text), detect(text))]
+    spans.append((start, len(text), kind))
+
+    # Roman runs are composed first, since the evidence is in composed form.
+    return [(begin, end,
+             _detect_roman(unicodedata.normalize('NFC', text[begin:end]))
+             if label is _ROMAN else label) for begin, end, label in spans]
+
+
+def detect_encoding(data, size=ENCODING_SAMPLE_SIZE):
+    """Detect whether raw bytes are UTF-8 or ISCII, and their scheme.
+
+    Only the first `size` bytes are inspected, so it is enough to pass the
+    start of a file::
+
+        with open(path, 'rb') as f:
+            encoding, scheme = detect_encoding(f.read(ENCODING_SAMPLE_SIZE))
+
+    UTF-8 is recognized by decoding the sample, and its scheme comes from
+    :func:`detect`. A sequence cut off at the end is fine if `data` is at
+    least `size` bytes long, since the sample then ends where the data may
+    go on.
+    ISCII is recognized by its high bytes (``0xA1``--``0xFA``); its script
+    comes from the first attribute (ATR, ``0xEF``) switch, or is `None` if
+    the sample has none.
+
+    :param data: a `bytes` (Python 2: `str`) object, or anything else that
+                 can be sliced into one, such as an `mmap`.
+    :returns: a tuple ``(encoding, scheme)``. `encoding` is one of
+              ``'ascii'``, ``'utf-8'`` and ``'iscii'``, or `None` if the
+              data is neither. Empty data is ``('ascii', None)``.
+    """
+    sample = bytes(data[:size])
+    if not sample:
+        return 'ascii', None
+    if not Regex.HIGH_BYTE.search(sample):
+        return 'ascii', detect(sample.decode('ascii'))
+
+    try:
+        text = codecs.getincrementaldecoder('utf-8')().decode(
+            sample, len(sample) < size)
+    except UnicodeDecodeError:
+        pass
+    else:
+        return 'utf-8', detect(text)
+
+    if Regex.NOT_ISCII.search(sample):
+        return None, None
+    match = Regex.ISCII_ATR.search(sample)
+    if match:
+        return 'iscii', ISCII_ATR_SCHEMES[ord(match.group(1))]
+    return 'iscii', None
@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 
 # released under BSD License
 
@@ -11,8 +11,23 @@
 
 # for usage, either run the script or scroll down to end of the script
 
-import sys
+# importing this module also registers the codecs iscii-devanagari,
+# iscii-bengali, ... (see CODEC_SCRIPTS), so that ISCII files can be read with
+#
+#     open(path, encoding='iscii-devanagari')
+#
+# or decoded with data.decode('iscii-devanagari'). bytes that are not valid
+# in the script go to the errors handler, as for other codecs. the codecs
+# encode too, with text.encode('iscii-devanagari') (see unicode2iscii)
+
 import array
+import codecs
+import collections
+import mmap
+import multiprocessing
+import os
+import re
+import sys
 
 # Generic Constants
 
@@ -56,7 +71,7 @@ ISCII_SCRIPTS = {
     0x43 : 1,  # BENGALI
     0x44 : 5,  # TAMIL
     0x45 : 6,  # TELUGU
-    0x46 : 1,  # ASSAMESE
+    0x46 : 9,  # ASSAMESE
     0x47 : 4,  # ORIYA 
     0x48 : 7,  # KANNADA
     0x49 : 8,  # MALAYALAM
@@ -64,6 +79,11 @@ ISCII_SCRIPTS = {
     0x4B : 2   # PUNJABI
     }
 
+# the unicode block of each script, counting from 0 as in ISCII_SCRIPTS.
+# assamese has none of its own and is written with the bengali letters
+
+SCRIPT_BLOCKS = [0, 1, 2, 3, 4, 5, 6, 7, 8, 1]
+
 # ISCII_SPECIAL CHARS
 
 ISCII_SPECIALS = [ISCII_ATR, ISCII_EXT, ISCII_INV]
@@ -348,103 +368,149 @@ nukta_specials = {
 special_maps = {
     ## the two points which are different between assamese and bengali
     ## (according to the charts in ISCII-91 documentation)
-    (5, 0xCF) : 0x09F0,
-    (5, 0xD4) : 0x09F1,
+    (9, 0xCF) : 0x09F0,
+    (9, 0xD4) : 0x09F1,
     }
 
 
+def make_script_map(i):
+    """
+    returns the code points of the 256 iscii bytes in script i (0-9), with
+    INVALID_CHAR for the bytes that are not valid in it
+    """
 
-def make_script_maps():
-    _invalid_range = range(0xEB, 0xF1) + range(0xFB, 0xFF + 1)    
-    scripts = {}
-    
-    for i in range(9):
-        curr_scr = {}
-
-        for ch in range(0xA0):
-            curr_scr[ch] = ch
+    block = SCRIPT_BLOCKS[i]
 
+    _invalid_range = list(range(0xEB, 0xF1)) + list(range(0xFB, 0xFF + 1))
+    codes = list(range(0xA0)) + [INVALID_CHAR] * 0x60
 
-        for ch in range(0xA0, 0xFF + 1):
-                
-            if (ch in _invalid_range):
-                continue
+    for ch in range(0xA0, 0xFF + 1):
             
-            t = iscii_to_unicode[ch]
-            
-            if validation_table[t & 0xFF][i]:
-                curr_scr[ch] = t
+        if (ch in _invalid_range):
+            continue
+        
+        t = iscii_to_unicode[ch]
+        
+        if validation_table[t & 0xFF][block]:
+            codes[ch] = t + (block * 0x80)
 
-                curr_scr[ch] += (i * 0x80)
+    for j, ch in special_maps:
+        if j == i:
+            codes[ch] = special_maps[(j, ch)]
 
-            
-        scripts[i] = curr_scr
+    # the danda is common to all scripts; unicode only has the devanagari one
 
-    for i in special_maps:
-        scripts[i[0]][i[1]] = special_maps[i]
+    codes[ISCII_DANDA] = DANDA
 
-    return scripts
+    return codes
 
-## setup the script map  (iscii -> unicode) for all the supported scripts
-## hope it speeds up things
+## the tables for all the supported scripts, indexed by script * 256 + byte:
+## script_map holds the code points (iscii -> unicode), invalid_table 1 for
+## the bytes that are skipped. they are filled in by load_script on first
+## use of a script, and only read afterwards
 
-script_maps = make_script_maps()
+script_map = array.array('H', [INVALID_CHAR]) * (len(SCRIPT_BLOCKS) * 256)
+invalid_table = bytearray(len(SCRIPT_BLOCKS) * 256)
 
-####
+_loaded = [False] * len(SCRIPT_BLOCKS)
 
-def make_invalid_maps():
-    maps = {}
+## the bytes that may combine with the byte before or after them
 
-    for i in range(9):
-        curr_map = {}
-        
-        for j in range(0xFF + 1):
-            curr_map[j] = (not script_maps[i].has_key(j)) and \
-                          (j not in ISCII_SPECIALS)
-        maps[i] = curr_map
-        
-    return maps
+iscii_modifying = frozenset(
+    ISCII_SPECIALS + [ISCII_HALANT, ISCII_NUKTA, ISCII_DANDA])
 
-## setup the map of invalid characters for each script
+## fast path: runs of bytes that are neither modifying nor invalid map one
+## to one onto code points, so they are converted with bytes.translate
+## instead of the state machine. all code points are below 0x10000; the
+## low and high bytes are translated separately and interleaved into the
+## native byte order of array('H')
 
-invalid_chars = make_invalid_maps()
+if sys.byteorder == 'little':
+    _LOW, _HIGH = 0, 1
+    _utf16_decode = codecs.utf_16_le_decode
+    _utf16_encode = codecs.utf_16_le_encode
+else:
+    _LOW, _HIGH = 1, 0
+    _utf16_decode = codecs.utf_16_be_decode
+    _utf16_encode = codecs.utf_16_be_encode
 
-## tmp code
+def make_translate_table(codes):
+    return (bytes(x & 0xFF for x in codes), bytes(x >> 8 for x in codes))
 
-iscii_modifying = {}
-_tmp = ISCII_SPECIALS + [ISCII_HALANT, ISCII_NUKTA, ISCII_DANDA]
+def make_special_pattern(i):
+    special = [ch for ch in range(0xFF + 1)
+               if ch in iscii_modifying or invalid_table[(i << 8) + ch]]
 
-for i in range(0xFF + 1):
-    iscii_modifying[i] = int(i in _tmp)
+    return re.compile(b'[' + b''.join(re.escape(bytes([ch]))
+                                      for ch in special) + b']')
 
-## end of tmp code
+def make_pair_pattern(i):
+    # an ATR, EXT or INV and the byte it applies to, which is the next
+    # byte that is valid in script i
+    invalid = b''.join(re.escape(bytes([ch])) for ch in range(0xFF + 1)
+                       if invalid_table[(i << 8) + ch])
 
-def to_utf8(y):
+    if not invalid:
+        return re.compile(b'[\xd9\xef\xf0][\x00-\xff]')
+
+    return re.compile(b'[\xd9\xef\xf0][' + invalid + b']*'
+                      b'[^' + invalid + b']')
+
+## for each script, the translate tables, a pattern that matches the
+## bytes that need the state machine and one that matches the ATR, EXT
+## and INV sequences (filled in by load_script)
+
+translate_tables = [None] * len(SCRIPT_BLOCKS)
+special_patterns = [None] * len(SCRIPT_BLOCKS)
+pair_patterns = [None] * len(SCRIPT_BLOCKS)
+
+def translate_run(src, script, dest):
     """
-    converts an array of integers to utf8 string
+    appends the code points for src, which holds no modifying or invalid
+    bytes, to the array dest
     """
 
-    out = []
+    low, high = translate_tables[script]
+    buf = bytearray(2 * len(src))
+    buf[_LOW::2] = src.translate(low)
+    buf[_HIGH::2] = src.translate(high)
+    dest.frombytes(buf)
 
-    for x in y:
-
-        if x < 0x080:
-            out.append(x)
-        elif x < 0x0800:
-            out.append((x >> 6) | 0xC0)
-            out.append((x & 0x3F) | 0x80)
-        elif x < 0x10000:
-            out.append((x >> 12) | 0xE0)
-            out.append(((x >> 6) & 0x3F) | 0x80)
-            out.append((x & 0x3F) | 0x80)
-        else:
-            out.append((x >> 18) | 0xF0)
-            out.append((x >> 12) & 0x3F)
-            out.append(((x >> 6) & 0x3F) | 0x80)
-            out.append((x & 0x3F) | 0x80)
+def load_script(i):
+    """
+    fills in the decoding and encoding tables of script i (0-9), unless
+    that was done already
+    """
+
+    if _loaded[i]:
+        return
+
+    codes = make_script_map(i)
+    base = i << 8
+
+    script_map[base:base + 256] = array.array('H', codes)
+    invalid_table[base:base + 256] = bytes(
+        x == INVALID_CHAR and ch not in ISCII_SPECIALS
+        for ch, x in enumerate(codes))
+
+    translate_tables[i] = make_translate_table(codes)
+    special_patterns[i] = make_special_pattern(i)
+    pair_patterns[i] = make_pair_pattern(i)
+    encode_tables[i] = make_encode_table(i, codes)
+    run_patterns[i] = make_run_pattern(i)
+
+    _loaded[i] = True
+
+def to_utf8(y):
+    """
+    converts an array('H') of code points to utf8 bytes
+
+    the array is decoded in place through the buffer protocol, so the cost
+    per character does not depend on the input
+    """
+
+    return _utf16_decode(y)[0].encode('utf-8')
 
-    return ''.join(map(chr, out))
-        
     
 class IllegalInput(Exception):
     def __init__(self, e):
@@ -455,26 +521,102 @@ class IllegalInput(Exception):
     
 
 class Parser:
-    def __init__(self):
+    """
+    converts iscii to unicode code points, collected in self.dest
+
+    instead of reporting problems as it goes, the parser counts what it
+    sees (see statistics). if max_errors is given, the positions of the
+    last max_errors problems are also kept in self.errors, as tuples of
+    (offset in the input, byte, message)
+
+    invalid bytes are skipped, unless errors names an error handler other
+    than 'ignore' (see codecs.register_error). the handler gets a
+    UnicodeDecodeError for each invalid byte, and its replacement ends the
+    character before it
+    """
+
+    def __init__(self, max_errors = 0, errors = 'ignore'):
 
         self.delta = 0
         self.curr_mask = 0 # current mask to unicode
+        self.curr_script = 0
+        self.base = 0 # offset of the current script in the tables
+        load_script(0)
 
+        # the last byte read, kept until we know whether the next byte
+        # modifies it. this carries over from one call of iscii2utf8 to
+        # the next
         self.prev_char = self.src_char = self.dest_char = NO_CHAR
 
-        self.dest = []
+        self.dest = array.array('H')
         self.pos = 0
 
-        self.stat = [0] * 10
+        # counters: invalid bytes skipped per value, ATR switches per
+        # script (0 for the default and unknown scripts), EXT and INV
+        # sequences, EXT sequences that were not understood, bytes read
+        # and code points written
+
+        self.invalid = [0] * 256
+        self.atr = [0] * 11
+        self.ext = self.inv = self.ext_invalid = 0
+        self.bytes_in = self.chars_out = 0
+
+        self.errors = collections.deque(maxlen = max_errors)
+
+        # offset of the byte being handled, for the error log
+        self.offset = 0
+
+        if errors == 'ignore':
+            self.handler = None
+        else:
+            self.handler = codecs.lookup_error(errors)
+
+    def statistics(self):
+        """
+        returns the counters as a dict. invalid holds only the byte values
+        that were seen, atr only the scripts that were switched to
+        """
+
+        return {
+            'bytes_in' : self.bytes_in,
+            'chars_out' : self.chars_out,
+            'invalid' : dict((i, x) for i, x in enumerate(self.invalid) if x),
+            'atr' : dict((i, x) for i, x in enumerate(self.atr) if x),
+            'ext' : self.ext,
+            'ext_invalid' : self.ext_invalid,
+            'inv' : self.inv,
+            'errors' : len(self.errors),
+            }
+
+    def log_error(self, byte, message):
+
+        if self.errors.maxlen:
+            self.errors.append((self.offset, byte, message))
+
+    def write_output(self, stream = None):
+        """
+        writes the code points converted so far as utf8 to the binary
+        stream (default: stdout), and clears them
+        """
 
-    def write_output(self):
+        if stream is None:
+            stream = sys.stdout.buffer
 
-        out = to_utf8(self.dest)
-        sys.stdout.write(out)
+        stream.write(to_utf8(self.dest))
 
-        self.dest = []
+        del self.dest[:]
         
-                       
+    def read_output(self):
+        """
+        returns the code points converted so far as a str, and clears them
+        """
+
+        # surrogatepass keeps the lone surrogates of surrogateescape
+        out = _utf16_decode(self.dest, 'surrogatepass')[0]
+        del self.dest[:]
+
+        return out
+
 
     def set_script(self, i):
         """
@@ -482,39 +624,42 @@ class Parser:
         
         """
 
-        if i in range(1, 10):
+        if i in range(0, 11):
             n = i - 1
         else:
-            raise IllegalInput, "Invalid Value for ATR %s" % (hex(i))
+            raise IllegalInput("Invalid Value for ATR %s" % (hex(i)))
 
         if n > -1: # n = -1 is the default script ..
+            load_script(n)
             self.curr_script = n
-            self.delta = n * DELTA
+            self.delta = SCRIPT_BLOCKS[n] * DELTA
+            self.base = n << 8
         
         return
     
 
     def isvalid(self, i):
 
-        return validation_table[i & 0xFF][self.curr_script]
+        return validation_table[i & 0xFF][SCRIPT_BLOCKS[self.curr_script]]
     
 
     def isvalid_iscii(self, x):
 
-        return not invalid_chars[self.curr_script].has_key(x)
+        return not invalid_table[self.base + x]
 
 
     def is_nukta_special(self, i):
 
         x = nukta_specials.get(i, None)
 
-        return x
+        if x is None or not self.isvalid(x):
+            return None
+
+        return x + self.delta
 
 
     def handle_ext(self, curr_char):
 
-        self.pos += 1 # for EXT
-        
         for a in range(1):
             
             if not ((EXT_RANGE_END >= curr_char) and\
@@ -534,23 +679,21 @@ class Parser:
             if self.isvalid(dest_char):
                 return dest_char
 
-
-        print >> sys.stderr, "Invalid input after EXT %s" % (hex(i))
+        self.ext_invalid += 1
+        self.log_error(curr_char, "invalid input after EXT")
         return None
     
 
     def handle_atr(self, i):
 
-        print >> sys.stderr, "Handling ATR:",
-        if i in ISCII_SCRIPTS.keys():
-            self.set_script(ISCII_SCRIPTS[i])
-            print >> sys.stderr, "setting script to", i
+        if i in ISCII_SCRIPTS:
+            # ISCII_SCRIPTS counts from 0, set_script from 1
+            self.set_script(ISCII_SCRIPTS[i] + 1)
+            self.atr[ISCII_SCRIPTS[i] + 1] += 1
         else:
             # ignore all other ATR markers
-            print >> sys.stderr, "ignored"
-            pass
-        
-        self.pos += 2 # for ATR and the following char
+            self.atr[0] += 1
+            self.log_error(i, "ATR ignored")
         
         return None
 
@@ -561,8 +704,6 @@ class Parser:
         else:
             ret = ZWJ
 
-        self.pos += 1 # for INV
-
         return ret
         
 
@@ -573,10 +714,12 @@ class Parser:
                 
         elif prev_char == ISCII_EXT:
                 
+            self.ext += 1
             ret = self.handle_ext(src_char)
             
         elif prev_char == ISCII_INV:
             
+            self.inv += 1
             ret = self.handle_inv(src_char)
             
         return ret
@@ -584,37 +727,73 @@ class Parser:
 
 
     def iscii2utf8(self, src, flush = 0):
+        """
+        converts the iscii bytes in src and appends the code points to
+        self.dest
+
+        the last byte may combine with the first byte of the next call,
+        so it is kept in self.prev_char. pass flush = 1 with the last
+        chunk to convert it as well
+
+        returns the number of bytes consumed, which is always len(src)
+        """
 
         dest = self.dest
-        src = array.array('B', src).tolist()
+        prev_char = self.prev_char
 
-        
-        curr_char = prev_char = NO_CHAR
+        src = bytes(src)
         n = len(src)
-        self.pos = 0
-
-        stat = self.stat
-        
-        for i in range(n):
-            curr_char = src[i]
+        pos = 0
+        start = len(dest)
+
+        while pos < n:
+
+            if prev_char not in ISCII_SPECIALS:
+                # bytes up to the next special one go through the fast
+                # path, except the last, which may combine with it
+                m = special_patterns[self.curr_script].search(src, pos)
+                end = m.start() if m else n
+
+                if end > pos:
+                    if prev_char != NO_CHAR:
+                        dest.append(script_map[self.base + prev_char])
+                    translate_run(src[pos:end - 1], self.curr_script, dest)
+                    prev_char = src[end - 1]
+                    pos = end
+                    continue
+
+            curr_char = src[pos]
+            pos += 1
             dest_char = NO_CHAR
             add_prev = 0
             
-            if invalid_chars[self.curr_script][curr_char]:
+            if invalid_table[self.base + curr_char]:
                 # just ignore the invalid iscii characters
-                print >> sys.stderr, 'ignoring invalid iscii char', \
-                      hex(curr_char)
-                self.pos += 1
+                self.invalid[curr_char] += 1
+                if self.errors.maxlen:
+                    self.offset = self.bytes_in + pos - 1
+                    self.log_error(curr_char, "invalid iscii char")
+
+                if self.handler is not None:
+                    exc = UnicodeDecodeError('iscii', src, pos - 1, pos,
+                                             'invalid iscii byte')
+                    replacement, pos = self.handler(exc)
+
+                    # an ATR, EXT or INV still applies to the next byte
+                    if prev_char not in ISCII_SPECIALS:
+                        if prev_char != NO_CHAR:
+                            dest.append(script_map[self.base + prev_char])
+                        prev_char = NO_CHAR
+                    dest.frombytes(_utf16_encode(replacement,
+                                                 'surrogatepass')[0])
                 continue
             
-            if flush and (i == (n - 1)):
-                dest_char = curr_char
-            
-            elif (prev_char == NO_CHAR):
+            if (prev_char == NO_CHAR):
                 prev_char = curr_char
                 continue
             
             elif prev_char in ISCII_SPECIALS:
+                self.offset = self.bytes_in + pos - 1
                 ret = self.post_analysis(prev_char, curr_char)
 
                 if ret is not None:
@@ -622,7 +801,7 @@ class Parser:
                     
                 prev_char = NO_CHAR
 
-            elif not iscii_modifying[curr_char]:
+            elif curr_char not in iscii_modifying:
                 pass
                 
             elif curr_char in ISCII_SPECIALS:
@@ -632,7 +811,6 @@ class Parser:
             elif (curr_char == ISCII_DANDA) and (prev_char == ISCII_DANDA):
                 dest_char = DOUBLE_DANDA
                 prev_char = NO_CHAR
-                self.pos += 1
                     
             elif (curr_char == ISCII_HALANT) and (prev_char == ISCII_HALANT):
                 dest_char = ZWNJ
@@ -649,7 +827,6 @@ class Parser:
                     if tmp: # nukta special
                         dest_char = tmp
                         prev_char = NO_CHAR
-                        self.pos += 1
 
             to_add = []
             
@@ -666,29 +843,504 @@ class Parser:
 
             for ch in to_add:
                 if (ch <= 0xFF):
-                    m = script_maps[self.curr_script][ch]
+                    m = script_map[self.base + ch]
                 else:
                     m = ch
 
                     # end of mapping
                     
-                self.pos += 1
-                self.dest.append(m)
+                dest.append(m)
+
+        if flush and prev_char != NO_CHAR:
+            # an ATR, EXT or INV without the byte it applies to is dropped
+            if prev_char not in ISCII_SPECIALS:
+                dest.append(script_map[self.base + prev_char])
+            prev_char = NO_CHAR
 
+        self.prev_char = prev_char
+        self.pos = n
+
+        self.bytes_in += n
+        self.chars_out += len(dest) - start
 
         return self.pos
     
 
+# unicode -> iscii
+
+# the ATR code for each script
+
+ATR_CODES = dict((j, i) for i, j in ISCII_SCRIPTS.items() if j > -1)
+
+def make_encode_table(i, codes):
+    """
+    inverts codes (the script map of script i) and nukta_specials into a
+    str.translate table, mapping code points to the iscii bytes as latin-1
+    chars
+
+    only code points in the unicode block of the script are included, plus
+    those common to all scripts (below 0xA0, the dandas, and ZWNJ and ZWJ,
+    which are only valid after a halant, as in halant halant and halant
+    nukta)
+    """
+
+    block = SCRIPT_BLOCKS[i]
+    begin = UNI_BEGIN + block * DELTA
+    table = {}
+
+    for ch in range(0xA0):
+        table[ch] = chr(ch)
+
+    for ch in range(0xA0, 0xFF + 1):
+        if begin <= codes[ch] < begin + DELTA:
+            table[codes[ch]] = chr(ch)
+
+    for ch, x in nukta_specials.items():
+        if validation_table[x & 0x7F][block]:
+            table[x + block * DELTA] = chr(ch) + chr(ISCII_NUKTA)
+
+    table[DANDA] = chr(ISCII_DANDA)
+    table[DOUBLE_DANDA] = chr(ISCII_DANDA) * 2
+    table[ZWNJ] = chr(ISCII_HALANT)
+    table[ZWJ] = chr(ISCII_NUKTA)
+
+    return table
+
+def make_run_pattern(i):
+    chars = ''.join(re.escape(chr(x)) for x in encode_tables[i]
+                    if x not in (ZWNJ, ZWJ))
+    halant = chr(HALANT + SCRIPT_BLOCKS[i] * DELTA)
+
+    return re.compile('(?:[%s]+|(?<=%s)[\u200c\u200d])+' % (chars, halant))
+
+## for each script, the str.translate table and a pattern that matches the
+## longest run from a position that encodes in it (filled in by
+## load_script)
+
+encode_tables = [None] * len(SCRIPT_BLOCKS)
+run_patterns = [None] * len(SCRIPT_BLOCKS)
+
+def unicode2iscii(text, script = 1, errors = 'strict', pos = 0):
+    """
+    converts text[pos:] to iscii, starting in script (1-10, as for
+    Parser.set_script)
+
+    runs of text in one script are converted with str.translate; an ATR
+    is emitted only where the script changes. a ZWJ that does not follow a
+    halant is emitted as INV INV, which decodes back to a ZWJ. characters
+    that cannot be encoded are passed to the errors handler
+
+    returns the iscii bytes and the script in effect at the end
+    """
+
+    n = len(text)
+    curr_script = script - 1
+    load_script(curr_script)
+    out = []
+
+    while pos < n:
+        m = run_patterns[curr_script].match(text, pos)
+
+        if m:
+            out.append(m.group().translate(encode_tables[curr_script])
+                       .encode('latin-1'))
+            pos = m.end()
+            continue
+
+        # the code point is in another script, or in none
+        x = ord(text[pos])
+
+        if x == ZWJ:
+            out.append(bytes([ISCII_INV, ISCII_INV]))
+            pos += 1
+            continue
+
+        block = (x - UNI_BEGIN) >> 7
+
+        for i, j in enumerate(SCRIPT_BLOCKS):
+            if j == block:
+                load_script(i)
+
+                if x in encode_tables[i]:
+                    break
+        else:
+            i = None
+
+        if i is not None:
+            out.append(bytes([ISCII_ATR, ATR_CODES[i]]))
+            curr_script = i
+            continue
+
+        handler = codecs.lookup_error(errors)
+        exc = UnicodeEncodeError('iscii', text, pos, pos + 1,
+                                 'character maps to <undefined>')
+        replacement, pos = handler(exc)
+
+        if isinstance(replacement, str):
+            replacement = replacement.encode('ascii')
+        out.append(replacement)
+
+    return b''.join(out), curr_script + 1
+
+
+# codecs
+
+# names of the iscii codecs, without the iscii- prefix, and their scripts
+# as numbers for Parser.set_script
+
+CODEC_SCRIPTS = {
+    'devanagari' : 1,
+    'bengali' : 2,
+    'assamese' : 10,
+    'punjabi' : 3,
+    'gurmukhi' : 3,
+    'gujarati' : 4,
+    'oriya' : 5,
+    'tamil' : 6,
+    'telugu' : 7,
+    'kannada' : 8,
+    'malayalam' : 9,
+    }
+
+
+class IncrementalDecoder(codecs.IncrementalDecoder):
+    """
+    decodes iscii in chunks of any size. the iscii-<script> codecs use
+    subclasses that set script, the script in effect until the first
+    ATR switch
+    """
+
+    script = 1
+
+    def __init__(self, errors='strict'):
+        codecs.IncrementalDecoder.__init__(self, errors)
+        self.reset()
+
+    def decode(self, input, final=False):
+        self.parser.iscii2utf8(input, final)
+        return self.parser.read_output()
+
+    def reset(self):
+        self.parser = Parser(errors = self.errors)
+        self.parser.set_script(self.script)
+
+    def getstate(self):
+        # the pending byte, and the script switched to by an ATR (0 if it
+        # is still self.script)
+        parser = self.parser
+
+        if parser.prev_char == NO_CHAR:
+            pending = b''
+        else:
+            pending = bytes([parser.prev_char])
+
+        if parser.curr_script == self.script - 1:
+            return (pending, 0)
+        return (pending, parser.curr_script + 1)
+
+    def setstate(self, state):
+        pending, script = state
+
+        self.reset()
+        if script:
+            self.parser.set_script(script)
+        self.parser.iscii2utf8(pending)
+
+
+class IncrementalEncoder(codecs.IncrementalEncoder):
+    """
+    encodes to iscii in chunks of any size, starting in script like
+    IncrementalDecoder
+    """
+
+    script = 1
+
+    def __init__(self, errors='strict'):
+        codecs.IncrementalEncoder.__init__(self, errors)
+        self.reset()
+
+    def encode(self, input, final=False):
+        # the last character is kept, since a ZWNJ or ZWJ is only valid
+        # after a halant
+        text = self.last + input
+        out, self.curr_script = unicode2iscii(text, self.curr_script,
+                                              self.errors, len(self.last))
+        self.last = text[-1:]
+        return out
+
+    def reset(self):
+        self.curr_script = self.script
+        self.last = ''
+
+    def getstate(self):
+        # the script, and the last character above it
+        return self.curr_script | (ord(self.last or '\0') << 4)
+
+    def setstate(self, state):
+        self.curr_script = state & 0xF
+        self.last = chr(state >> 4).strip('\0')
+
+
+def search_codec(name):
+    """
+    codec search function for the iscii-<script> codecs
+    """
+
+    name = name.replace('_', '-')
+    if not name.startswith('iscii-'):
+        return None
+
+    script = CODEC_SCRIPTS.get(name[len('iscii-'):])
+    if script is None:
+        return None
+
+    decoder = type('IncrementalDecoder', (IncrementalDecoder,),
+                   {'script' : script})
+    encoder = type('IncrementalEncoder', (IncrementalEncoder,),
+                   {'script' : script})
+
+    def decode(input, errors='strict'):
+        return decoder(errors).decode(input, True), len(input)
+
+    def encode(input, errors='strict'):
+        return unicode2iscii(input, script, errors)[0], len(input)
+
+    return codecs.CodecInfo(encode, decode, name=name,
+                            incrementalencoder=encoder,
+                            incrementaldecoder=decoder)
+
+codecs.register(search_codec)
+
+
+# parallel conversion of large files
+
+# default size of the slices that convert_file hands to each process
+
+slice_size = 1 << 22
+
+def _follow_pairs(data, pos, end, script):
+    """
+    follows the ATR, EXT and INV sequences in data[pos:end] the way Parser
+    does, skipping the bytes that are invalid in the current script, and
+    starting in script (1-10). returns the script in effect at end and the
+    offset just past the last sequence (pos if there is none)
+    """
+
+    last = pos
+
+    while True:
+        load_script(script - 1)
+
+        for m in pair_patterns[script - 1].finditer(data, pos, end):
+            last = m.end()
+            i = ISCII_SCRIPTS.get(data[last - 1], -1) + 1
+
+            if data[m.start()] == ISCII_ATR and i and i != script:
+                # the rest is matched with the pattern of the new script
+                script = i
+                pos = last
+                break
+        else:
+            return script, last
+
+
+def split_file(data, script, size = None):
+    """
+    splits data (an mmap) into slices that can be converted independently
+
+    yields (start, end, script) for slices of about size bytes. every slice
+    but the last ends with a newline that is not the argument of an ATR,
+    EXT or INV, so nothing is pending in the parser at its end. script is
+    the script (1-10) in effect at start, after any ATR switches in earlier
+    slices
+    """
+
+    if size is None:
+        size = slice_size
+
+    n = len(data)
+    start = 0
+
+    while start < n:
+        pos = start
+        next_script = script
+        end = data.find(b'\n', start + size - 1)
+
+        while True:
+            end = n if end < 0 else end + 1
+            next_script, last = _follow_pairs(data, pos, end, next_script)
+
+            if last < end or end == n:
+                break
+
+            # the newline is the argument of an ATR, EXT or INV
+            pos = end
+            end = data.find(b'\n', end)
+
+        yield start, end, script
+
+        script = next_script
+        start = end
+
+
+def _convert_slice(args):
+    path, start, end, script = args
+
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+
+        try:
+            parser = Parser()
+            parser.set_script(script)
+            parser.iscii2utf8(data[start:end], 1)
+        finally:
+            data.close()
+
+    return to_utf8(parser.dest)
+
+
+def convert_file(src, dest, script, processes = None, size = None):
+    """
+    converts the iscii file src into the utf-8 file dest
+
+    src is memory-mapped and split into slices of about size bytes (see
+    split_file), which a pool of processes (default: one per cpu) converts
+    in parallel. the output is written in order
+    """
+
+    with open(src, 'rb') as f, open(dest, 'wb') as out:
+
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+
+        data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+
+        try:
+            tasks = ((src, start, end, i)
+                     for start, end, i in split_file(data, script, size))
+
+            with multiprocessing.Pool(processes) as pool:
+                for chunk in pool.imap(_convert_slice, tasks):
+                    out.write(chunk)
+        finally:
+            data.close()
+
+
+# iscii -> sanscript schemes
+
+# the sanscript scheme of each script, as numbers for Parser.set_script.
+# assamese text is in the bengali block, and transliterated as bengali
+
+SANSCRIPT_SCHEMES = {
+    1 : 'devanagari',
+    2 : 'bengali',
+    3 : 'gurmukhi',
+    4 : 'gujarati',
+    5 : 'oriya',
+    6 : 'tamil',
+    7 : 'telugu',
+    8 : 'kannada',
+    9 : 'malayalam',
+    }
+
+def make_block_patterns():
+    patterns = []
+
+    for i in range(9):
+        begin = UNI_BEGIN + i * DELTA
+
+        # the indic code points outside the block, except the dandas
+        others = []
+        if i > 0:
+            others += [(UNI_BEGIN, DANDA - 1), (DOUBLE_DANDA + 1, begin - 1)]
+        if i < 8:
+            others.append((begin + DELTA, INDIC_BLOCK_END))
+
+        patterns.append(re.compile('[^%s]*' % ''.join(
+            '%s-%s' % (chr(x), chr(y)) for x, y in others)))
+
+    return patterns
+
+## matches the longest run from a position that is in the unicode block of
+## each script, or in none (the dandas count as none). made by iscii2scheme
+## on first use
+
+block_patterns = None
+
+def iscii2scheme(chunks, _to, script = 1, **kw):
+    """
+    transliterates iscii into the sanscript scheme _to, chunk by chunk
+
+    chunks is an iterable of bytes, such as a file opened in binary mode.
+    the decoded code points go straight to sanscript.transliterate with a
+    scheme map for each script that the text switches to. yields the
+    transliterated text for each chunk. kw is passed on to transliterate
+    """
+
+    from indic_transliteration import sanscript
+
+    global block_patterns
+    if block_patterns is None:
+        block_patterns = make_block_patterns()
+
+    scheme_maps = {}
+    consonants = set()
+    for name in SANSCRIPT_SCHEMES.values():
+        consonants.update(sanscript.SCHEMES[name]['consonants'])
+
+    parser = Parser()
+    parser.set_script(script)
+    curr_script = SCRIPT_BLOCKS[parser.curr_script]
+    carry = ''
+
+    def transliterate(text):
+        nonlocal curr_script
+
+        out = []
+        pos = 0
+
+        while pos < len(text):
+            m = block_patterns[curr_script].match(text, pos)
+
+            if m.end() > pos:
+                if curr_script not in scheme_maps:
+                    scheme_maps[curr_script] = sanscript.SchemeMap(
+                        sanscript.SCHEMES[SANSCRIPT_SCHEMES[curr_script + 1]],
+                        sanscript.SCHEMES[_to])
+                out.append(sanscript.transliterate(
+                    m.group(), scheme_map = scheme_maps[curr_script], **kw))
+                pos = m.end()
+            else:
+                curr_script = (ord(text[pos]) - UNI_BEGIN) // DELTA
+
+        return ''.join(out)
+
+    for chunk in chunks:
+        parser.iscii2utf8(chunk)
+        text = carry + parser.read_output()
+
+        # a trailing consonant waits for the vowel sign or virama that may
+        # follow it in the next chunk
+        carry = ''
+        if text and text[-1] in consonants:
+            text, carry = text[:-1], text[-1]
+
+        yield transliterate(text)
+
+    parser.iscii2utf8(b'', 1)
+    yield transliterate(carry + parser.read_output())
+
+
 def show_usage(name):
     usage = """
     Usage:
 
-    %s script
+    %s script [input output [processes]]
 
-    where script is a number between 1-9
+    where script is a number between 1-10
 
     1 - devnag
-    2 - bengali / assamese
+    2 - bengali
     3 - punjabi
     4 - gujarati
     5 - oriya
@@ -696,13 +1348,16 @@ def show_usage(name):
     7 - telugu
     8 - kannada
     9 - malayalam
+    10 - assamese
 
-    the program reads from stdin and writes to stdout
+    the program reads from stdin and writes to stdout, unless the input and
+    output files are given. large input files are converted in parallel by
+    processes processes (default: one per cpu)
 
     any msgs to the user (error msgs etc) are printed on stderr
     """ % (name)
     
-    print >> sys.stderr,  usage
+    print(usage, file=sys.stderr)
     sys.exit(1)
 
 
@@ -714,31 +1369,41 @@ if __name__ == '__main__':
         
         i = int(sys.argv[1])
         
-        if i not in range(1, 10):
+        if i not in range(1, 11):
+            raise ValueError
+
+        if len(sys.argv) not in (2, 4, 5):
             raise ValueError
+
+        processes = None
+        if len(sys.argv) == 5:
+            processes = int(sys.argv[4])
     
     except (ValueError, IndexError):
         show_usage(sys.argv[0])
+
+    if len(sys.argv) > 2:
+        convert_file(sys.argv[2], sys.argv[3], i, processes)
+        sys.exit(0)
     
     mypar = Parser()
     mypar.set_script(i)
 
-    y = ''
-    flush = 0
-    
+    stdin = sys.stdin.buffer
+
     while 1:
         
-        if flush:
-            break
-        
-        x = sys.stdin.read(chunk_size)
+        x = stdin.read(chunk_size)
         
+        mypar.iscii2utf8(x, not x)
+        mypar.write_output()
+
         if not x:
-            flush = 1
+            break
 
-        x = y + x
-        
-        n = mypar.iscii2utf8(x, flush)
-        y = x[n:]
+    stat = mypar.statistics()
 
-        mypar.write_output()
+    if stat['invalid'] or stat['ext_invalid']:
+        print("skipped %d invalid bytes and %d invalid EXT sequences"
+              % (sum(stat['invalid'].values()), stat['ext_invalid']),
+              file=sys.stderr)
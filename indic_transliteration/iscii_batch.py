@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+indic_transliteration.iscii_batch
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Converts a directory tree of ISCII files to UTF-8.
+
+Every file under the source directory is converted into the same relative
+path under the destination directory, by a pool of processes. The encoding
+of each file is detected with
+:func:`~indic_transliteration.detect.detect_encoding`. ISCII files start in
+the script given on the command line, or in Devanagari, and switch scripts
+at their ATR codes. Files that already are UTF-8 (or ASCII) are copied
+unchanged, whether or not a script is given; files that are neither, or
+that cannot be read, are reported as failed.
+
+A JSON manifest in the destination directory records the size, modification
+time and SHA-256 hash of every source file. It is saved every
+:data:`CHECKPOINT_FILES` files and when the run stops, so an interrupted run
+keeps its progress. On the next run, files whose size and modification time
+are unchanged are skipped without being read, and files whose content hash
+is unchanged are skipped without being converted. Run it as::
+
+    python -m indic_transliteration.iscii_batch corpus/ corpus-utf8/
+    python -m indic_transliteration.iscii_batch --script tamil corpus/ out/
+
+:license: BSD
+"""
+
+import argparse
+import collections
+import hashlib
+import json
+import multiprocessing
+import os
+
+from indic_transliteration import detect, iscii2utf8
+
+#: Name of the manifest file, written in the destination directory.
+MANIFEST_NAME = '.iscii_manifest.json'
+
+#: Version of the manifest format. Manifests of other versions are ignored.
+MANIFEST_VERSION = 1
+
+#: Number of files converted between two saves of the manifest.
+CHECKPOINT_FILES = 1000
+
+
+def load_manifest(path, script):
+    """Return the files recorded in the manifest at `path`.
+
+    The manifest is ignored, and an empty `dict` returned, if it does not
+    exist, has another format version, or was written for another `script`.
+    """
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (IOError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION or \
+            manifest.get('script') != script:
+        return {}
+    return manifest.get('files', {})
+
+
+def save_manifest(path, script, files):
+    """Write the manifest to `path`, replacing the old one atomically."""
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'version': MANIFEST_VERSION, 'script': script,
+                   'files': files}, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _script(data, script):
+    """Return the encoding of `data` and the script to decode it with.
+
+    `script`, if not `None`, is the script of the data only if it is ISCII.
+    Otherwise ISCII starts in Devanagari, like the parser, and its ATR
+    switches take effect where they are.
+    """
+    encoding = detect.detect_encoding(data)[0]
+    if encoding != 'iscii':
+        return encoding, None
+    return encoding, script or 'devanagari'
+
+
+def _failed(error):
+    """Return the manifest entry for a file that could not be converted."""
+    return {'status': 'failed',
+            'error': '%s: %s' % (type(error).__name__, error)}
+
+
+def convert(task):
+    """Convert one file. Run in the worker processes.
+
+    :param task: a tuple ``(source path, destination path, script, hash)``,
+                 where `script` is the name of an ISCII codec without its
+                 ``iscii-`` prefix, or `None` for Devanagari, and `hash` is
+                 the hash recorded in the manifest, or `None`.
+    :returns: the manifest entry for the file. Errors are not raised but
+              recorded in the entry, so that one file does not stop the run.
+    """
+    try:
+        return _convert(*task)
+    except Exception as e:
+        return _failed(e)
+
+
+def _convert(src, dest, script, old_hash):
+    with open(src, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        data = f.read()
+
+    entry = {
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'sha256': hashlib.sha256(data).hexdigest(),
+    }
+    if entry['sha256'] == old_hash and os.path.exists(dest):
+        entry['status'] = 'unchanged'
+        return entry
+
+    encoding, entry['script'] = _script(data, script)
+    if encoding is None:
+        entry['status'] = 'failed'
+        return entry
+
+    if encoding == 'iscii':
+        parser = iscii2utf8.Parser()
+        parser.set_script(iscii2utf8.CODEC_SCRIPTS[entry['script']])
+        parser.iscii2utf8(data, 1)
+        entry['invalid'] = sum(parser.invalid)
+        data = iscii2utf8.to_utf8(parser.dest)
+        entry['status'] = 'converted'
+    else:
+        entry['status'] = 'copied'
+
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    with open(dest, 'wb') as f:
+        f.write(data)
+    return entry
+
+
+def convert_tree(src, dest, script=None, processes=None, manifest=None):
+    """Convert the files under `src` into the same paths under `dest`.
+
+    :param script: the name of an ISCII codec without its ``iscii-`` prefix,
+                   such as ``'tamil'``, that ISCII files start in. The
+                   default is Devanagari.
+    :param processes: the number of worker processes. The default is one
+                      per CPU.
+    :param manifest: the path of the manifest. The default is
+                     :data:`MANIFEST_NAME` in `dest`.
+    :returns: a :class:`collections.Counter` of the files by status:
+              ``'converted'``, ``'copied'``, ``'unchanged'`` or
+              ``'failed'``.
+    """
+    if script is not None and script not in iscii2utf8.CODEC_SCRIPTS:
+        raise ValueError('Unknown script %s' % script)
+    if manifest is None:
+        manifest = os.path.join(dest, MANIFEST_NAME)
+
+    old = load_manifest(manifest, script)
+    files = {}
+    tasks = []
+    # neither the output nor the manifest is input, if they are under src
+    skip = set(os.path.abspath(path)
+               for path in (dest, manifest, manifest + '.tmp'))
+
+    def walk_error(error):
+        files[os.path.relpath(error.filename, src)] = _failed(error)
+
+    for root, dirs, names in os.walk(src, onerror=walk_error):
+        dirs[:] = sorted(name for name in dirs if os.path.abspath(
+            os.path.join(root, name)) not in skip)
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            if os.path.abspath(path) in skip:
+                continue
+            rel = os.path.relpath(path, src)
+            out = os.path.join(dest, rel)
+            entry = old.get(rel)
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                files[rel] = _failed(e)
+                continue
+            if entry and entry['status'] != 'failed' and \
+                    entry['size'] == stat.st_size and \
+                    entry['mtime'] == stat.st_mtime_ns and \
+                    os.path.exists(out):
+                files[rel] = dict(entry, status='unchanged')
+                continue
+            old_hash = entry.get('sha256') if entry else None
+            tasks.append((rel, (path, out, script, old_hash)))
+
+    # until they are converted, files keep their old entries in the manifest
+    pending = dict((rel, old[rel]) for rel, task in tasks if rel in old)
+    os.makedirs(os.path.dirname(os.path.abspath(manifest)), exist_ok=True)
+    try:
+        with multiprocessing.Pool(processes) as pool:
+            entries = pool.imap(convert, [task for rel, task in tasks],
+                                chunksize=16)
+            for i, ((rel, task), entry) in enumerate(zip(tasks, entries)):
+                if entry['status'] == 'unchanged':
+                    entry = dict(old[rel], **entry)
+                files[rel] = entry
+                pending.pop(rel, None)
+                if (i + 1) % CHECKPOINT_FILES == 0:
+                    save_manifest(manifest, script, dict(pending, **files))
+    finally:
+        save_manifest(manifest, script, dict(pending, **files))
+    return collections.Counter(entry['status'] for entry in files.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('src', help='directory of ISCII files')
+    parser.add_argument('dest', help='directory for the UTF-8 files')
+    parser.add_argument('--script', choices=sorted(iscii2utf8.CODEC_SCRIPTS),
+                        help='script that ISCII files start in (default: '
+                             'devanagari)')
+    parser.add_argument('--processes', type=int,
+                        help='number of worker processes (default: one per '
+                             'CPU)')
+    parser.add_argument('--manifest', help='path of the manifest (default: '
+                                           '%s in dest)' % MANIFEST_NAME)
+    args = parser.parse_args(argv)
+
+    counts = convert_tree(args.src, args.dest, args.script, args.processes,
+                          args.manifest)
+    print(', '.join('%d %s' % (counts[status], status) for status in
+                    ('converted', 'copied', 'unchanged', 'failed')))
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+r"""
+indic_transliteration.legacy_fonts
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Converts text in legacy 8-bit font encodings to Unicode.
+
+Fonts such as Krutidev (Devanagari) or TSCII-like Tamil fonts put glyphs,
+not characters, at each byte. Converting them takes a byte map and then some
+reordering: the i-matra glyph comes before its consonant cluster, a reph
+glyph comes after it, and so on. A :class:`FontEncoding` declares both as
+data::
+
+    toy = FontEncoding('toy', {
+        'k': 'क', 'r': 'र', 'f': 'ि', 'Z': 'र्', 'd': '्',
+        'ks': 'क्ष',
+    }, rules=[
+        # the i-matra is typed before the cluster it follows
+        ('(ि)((?:%(C)s्)*%(C)s)', r'\2\1'),
+        # the reph is typed after the cluster and its vowel signs
+        ('((?:%(C)s्)*%(C)s%(M)s*)र्', r'र्\1'),
+    ], classes={'C': '[क-ह\u0958-\u095f]', 'M': '[ा-ौ]'})
+
+    toy.decode(b'fk')  # 'कि'
+
+Single bytes are converted with one ``str.translate`` call, byte sequences
+with one regex split, and each rule is one regex substitution over the
+whole text, so the cost per byte does not involve any Python code.
+
+This module is only the converter: it defines no encodings, and the tables
+of real fonts should be declared next to their users, from sources they can
+check.
+
+:license: MIT and BSD
+"""
+
+import re
+
+
+class FontEncoding(object):
+    """A legacy font encoding, compiled from its byte map and rules.
+
+    :param name: the name of the encoding.
+    :param table: maps byte sequences to Unicode strings. Keys may be `bytes`,
+                  `str` (whose characters are byte values, as in Latin-1) or
+                  `int` (a single byte). Bytes missing from the table decode
+                  as Latin-1.
+    :param rules: a sequence of ``(pattern, replacement)`` pairs, applied in
+                  order with :func:`re.sub` to the decoded text. Patterns may
+                  refer to `classes` as ``%(name)s``.
+    :param classes: maps names to regex fragments, typically character
+                    classes, for use in `rules`.
+    """
+
+    def __init__(self, name, table, rules=(), classes=None):
+        self.name = name
+        self.table = table
+        self.rules = list(rules)
+        self.classes = classes or {}
+
+        single = {}
+        multi = {}
+        for key, value in table.items():
+            if isinstance(key, int):
+                key = bytes([key])
+            elif isinstance(key, str):
+                key = key.encode('latin-1')
+            if len(key) == 1:
+                single[key[0]] = value
+            else:
+                multi[key.decode('latin-1')] = value
+
+        #: ``str.translate`` table for the single bytes, decoded as Latin-1.
+        self.translate_table = single
+        #: Values for the byte sequences, keyed as Latin-1 strings.
+        self.sequences = multi
+        #: Splits text at the byte sequences, longest first.
+        self.sequence_pattern = None
+        if multi:
+            keys = sorted(multi, key=len, reverse=True)
+            self.sequence_pattern = re.compile(
+                '(%s)' % '|'.join(re.escape(key) for key in keys))
+        #: The rules as compiled regexes.
+        self.compiled_rules = [(re.compile(pattern % self.classes), repl)
+                               for pattern, repl in self.rules]
+
+    def __repr__(self):
+        return 'FontEncoding(%r)' % self.name
+
+    def decode(self, data):
+        """Return `data`, a `bytes` object, converted to Unicode."""
+        text = bytes(data).decode('latin-1')
+        if self.sequence_pattern is None:
+            text = text.translate(self.translate_table)
+        else:
+            # re.split alternates between text and the sequences it split on
+            parts = self.sequence_pattern.split(text)
+            parts[::2] = [part.translate(self.translate_table)
+                          for part in parts[::2]]
+            parts[1::2] = [self.sequences[part] for part in parts[1::2]]
+            text = ''.join(parts)
+
+        for pattern, repl in self.compiled_rules:
+            text = pattern.sub(repl, text)
+        return text
@@ -24,17 +24,24 @@ new CharacterBlock and TransliterationScheme objects.
 COMMAND LINE USAGE
 ----------------------------
 
-python transliterator.py text inputFormat outputFormat
+python -m indic_transliteration.little.transliterator [options] \\
+    [text] inputFormat outputFormat
 
 ... writes the transliterated text to stdout
 
-text -- the text to be transliterated OR the name of a file containing the text
+text -- the text to be transliterated OR the name of a file containing the 
+        text. Without it, or if it is '-', the text is read from stdin.
 inputFormat -- the name of the character block or transliteration scheme that
                the text is to be transliterated FROM, e.g. 'CYRILLIC', 'IAST'.
                Not case-sensitive
 outputFormat -- the name of the character block or transliteration scheme that
                the text is to be transliterated TO, e.g. 'CYRILLIC', 'IAST'.
                Not case-sensitive
+-o, --output -- the file to write to, instead of stdout
+-j, --processes -- transliterate in this many processes, for big files
+
+Input is streamed line by line. In files, but not in text given on the 
+command line or on stdin, lines starting with '#' are skipped.
                
 USAGE
 --------
@@ -89,6 +96,15 @@ NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION
 WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
        
 """
+import io
+import itertools
+import os
+import unicodedata
+import re
+import sys
+import threading
+import types
+
 """ TO DO
 
 cyrillic: GOST & something ASCII-only & sensible
@@ -105,12 +121,87 @@ is there a problem with implicit A before visarga?
 """
 __version__ = '0.1'
 
-import unicodedata
-import doctest
-import sys
+""" The built-in character blocks and transliteration schemes are created 
+on first use: _loaders maps their upper-case names to functions that create
+them, and the registries below call those when a name is missing.
+"""
+_loaders = {}
+_loadLock = threading.RLock()
+
+class _Registry(dict):
+    """ Dict of formats by name, which creates built-in formats on demand.
+    
+    The names of the formats that are still to be created are in _pending.
+    They count as keys, so that in, iteration and len() see every format;
+    values() and items() create all of them first.
+    """
+    
+    def __init__(self):
+        dict.__init__(self)
+        self._pending = set()
+    
+    def __missing__(self, name):
+        with _loadLock:
+            loader = _loaders.pop(name.upper(), None)
+            if loader is not None:
+                try:
+                    loader()
+                except BaseException:
+                    # leave it for the next lookup
+                    _loaders[name.upper()] = loader
+                    raise
+        if not dict.__contains__(self, name):
+            raise KeyError(name)
+        return dict.__getitem__(self, name)
+    
+    def _pendingNames(self):
+        return [name for name in self._pending
+                if name in _loaders and not dict.__contains__(self, name)]
+    
+    def __contains__(self, name):
+        return dict.__contains__(self, name) or \
+            (name in self._pending and name in _loaders)
+    
+    def __iter__(self):
+        return itertools.chain(dict.__iter__(self), self._pendingNames())
+    
+    def __len__(self):
+        return dict.__len__(self) + len(self._pendingNames())
+    
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+    
+    def keys(self):
+        return list(self)
+    
+    def values(self):
+        return [self[name] for name in self.keys()]
+    
+    def items(self):
+        return [(name, self[name]) for name in self.keys()]
+
+def _lazy(name, factory, *args):
+    """ Create the built-in format called name with factory(*args) on first
+    use.
+    """
+    _loaders[name.upper()] = lambda: factory(*args)
+    _names._pending.add(name.upper())
+    if issubclass(factory, CharacterBlock):
+        characterBlocks._pending.add(name.upper())
+
+def _lazyVariant(name, baseName, delta):
+    """ Create the built-in scheme called name on first use, as a variant of
+    the scheme called baseName. See TransliterationScheme.variant().
+    """
+    _loaders[name.upper()] = lambda: _names[baseName.upper()].variant(name, 
+                                                                      delta)
+    _names._pending.add(name.upper())
 
-characterBlocks = {}
-_names = {}
+characterBlocks = _Registry()
+_names = _Registry()
 
 # handle unrecognised characters
 
@@ -120,30 +211,68 @@ UNRECOGNISED_SUBSTITUTE = 2
 
 # default options
 
-options = {}
+defaultOptions = types.MappingProxyType({
+    'inputEncoding' : 'utf-8',  # default input encoding for strings
+    'outputEncoding' : 'utf-8', # default output encoding
+    'substituteChar' : '?', # use to substitute unrecognised characters
+    'handleUnrecognised' : UNRECOGNISED_ECHO,   # unrecognised characters:
+                                                # fail, echo or substitute
+    'outputASCIIEncoded' : False,   # HTML-encoded ASCII output?                                                
+})
+
+""" Module-wide defaults. transliterate() never changes them: each call
+merges them with its requestOptions into a read-only mapping of its own,
+which is passed down to the code that needs it, so concurrent calls with
+different options do not interfere.
+"""
+options = dict(defaultOptions)
 def resetOptions():
     """ Reset options to their default values. """
-    global options
-    defaultOptions = {
-        'inputEncoding' : 'utf-8',  # default input encoding for strings
-        'outputEncoding' : 'utf-8', # default output encoding
-        'substituteChar' : '?', # use to substitute unrecognised characters
-        'handleUnrecognised' : UNRECOGNISED_ECHO,   # unrecognised characters:
-                                                    # fail, echo or substitute
-        'outputASCIIEncoded' : False,   # HTML-encoded ASCII output?                                                
-    }
-    options = defaultOptions.copy()
-resetOptions()
+    options.clear()
+    options.update(defaultOptions)
+
+def _callOptions(requestOptions):
+    """ Return the options for one call, as a read-only mapping. """
+    callOptions = dict(options)
+    callOptions.update(requestOptions)
+    return types.MappingProxyType(callOptions)
 
 
-def _unrecognised(chr):
+def _unrecognised(chr, options):
     """ Handle unrecognised characters. """
     if options['handleUnrecognised'] == UNRECOGNISED_ECHO:
         return chr
     elif options['handleUnrecognised'] == UNRECOGNISED_SUBSTITUTE:
         return options['substituteChar']
     else:
-        raise (KeyError, chr)
+        raise KeyError(chr)
+
+def _translator(mapping):
+    """ Return a str.translate() table for mapping, a dict from characters to
+    their equivalents, and a regex that matches the characters it does not 
+    map. Whitespace is left as it is, and is never unrecognised.
+    """
+    chars = [c for c in mapping if not c.isspace()]
+    table = dict((ord(c), mapping[c]) for c in chars)
+    unknown = re.compile('[^\\s%s]' % ''.join(re.escape(c) for c in chars))
+    return table, unknown
+
+def _translate(text, translator, options):
+    """ Transliterate text one character at a time with a translator from
+    _translator(). Unrecognised characters are left as they are by 
+    str.translate(), so they only need to be looked for if they are not to 
+    be echoed.
+    """
+    table, unknown = translator
+    if options['handleUnrecognised'] == UNRECOGNISED_ECHO:
+        return text.translate(table)
+    elif options['handleUnrecognised'] == UNRECOGNISED_SUBSTITUTE:
+        return options['substituteChar'].join(part.translate(table) 
+                                              for part in unknown.split(text))
+    match = unknown.search(text)
+    if match is not None:
+        raise KeyError(match.group())
+    return text.translate(table)
  
 class TLCharacter (object):
     """ Class representing a Unicode character with its equivalents.
@@ -151,7 +280,7 @@ class TLCharacter (object):
     Public attributes:
     unicodeHexValue -- the numeric value of the Unicode code point.
     chr -- the character value of the Unicode code point.
-    name -- the name of the Unicode code point.
+    name -- the name of the Unicode code point, looked up on first use.
     equivalents -- a dict containing the character's equivalents in 
                    various transliteration schemes, in the format:
                    {'Scheme A': 'A', 'Scheme B': 'aah', }
@@ -160,6 +289,8 @@ class TLCharacter (object):
                    character.
     
     """
+    
+    __slots__ = ('unicodeHexValue', 'chr', 'equivalents', '_block')
 
     def __init__(self, unicodeHexValue, block):
         """ Set up a unicode character.
@@ -174,15 +305,15 @@ class TLCharacter (object):
         
         """
         if unicodeHexValue < 0 or unicodeHexValue > 0x10FFFF:
-            raise (ValueError, "numeric value outside Unicode range")
+            raise ValueError("numeric value outside Unicode range")
         self.unicodeHexValue = unicodeHexValue
-        """ Use name check to filter out unused characters.
-              unicodedata.name() raises ValueError for these
-        """
         self.chr = chr(self.unicodeHexValue)
-        self.name = unicodedata.name(self.chr)
         self.equivalents = {}
         self._block = block
+    
+    @property
+    def name(self):
+        return unicodedata.name(self.chr)
         
     def addEquivalent(self, equivName, equivalent):
         """ Add an equivalent for the character.
@@ -217,40 +348,38 @@ class CharacterBlock(dict):
                      Should be a subclass of TLCharacter.
         
         """
-        
+        self._addCharacters(charRange, charClass)
+        self._longestEntry = 1
+        self.name = name
+        self.transliterationSchemes = {}
+        self._translators = {}
+        self._register()
+    
+    def _addCharacters(self, charRange, charClass):
         """ Ensure that any character sequence dependencies will be ok.
         
         e.g. set up Devanagari standalone vowels before dependents.
         
         """
-        charRange.sort()
-        
-        for c in charRange:
-            try:
+        for c in sorted(charRange):
+            if unicodedata.category(chr(c)) != 'Cn': # Unicode reserved
                 tlchar = charClass(c, self)
                 self[tlchar.chr] = tlchar
-            except ValueError: # Unicode reserved code points.
-                # not an error
-                pass
-        self._longestEntry = 1
-        self.name = name
-        self.transliterationSchemes = {}
-        self._register()
 
     def _register(self):
         characterBlocks[self.name] = self
         _names[self.name.upper()] = self
         
-    def _transliterate (self, text, outFormat):
+    def _transliterate (self, text, outFormat, options=defaultOptions):
         """ Transliterate the text to the target transliteration scheme."""
-        result = []
-        for c in text:
-            if c.isspace(): result.append(c)
-            try: 
-                result.append(self[c].equivalents[outFormat.name])
-            except KeyError:
-                result.append(_unrecognised(c))
-        return result
+        translator = self._translators.get(outFormat.name)
+        if translator is None:
+            translator = _translator(dict(
+                    (c, char.equivalents[outFormat.name]) 
+                    for c, char in self.items() 
+                    if outFormat.name in char.equivalents))
+            self._translators[outFormat.name] = translator
+        return [_translate(text, translator, options)]
         
     def _preprocess(self, text):
         """ Make our signature compatible with TransliterationScheme. """
@@ -303,68 +432,100 @@ class TransliterationScheme(dict):
             self[equiv].addEquivalent(self.name, equiv)
         self._longestEntry = max([len(e) for e in data.keys()])
         if self._longestEntry > 1:
-            self._parseTree = {}
-            self._parsedata = list(data.keys())
-            self._parsedata.sort()
-            self._setupParseTree(0, len(data) - 1, 0, self._parseTree)
+            self._setupTrie(data.keys())
         if swapTable is not None:
             if not isinstance(swapTable, dict): raise (TypeError)
         self.swapTable = swapTable
+        self._swapPattern = None
+        self._translator = None
+        if self._longestEntry == 1:
+            """ Every key is one character: transliterate with 
+            str.translate() rather than key by key.
+            """
+            self._translator = _translator(dict(
+                    (c, char.chr) for c, char in self.items()))
+        if swapTable:
+            """ One pass over the text for all the entries, longest first,
+            so that the result does not depend on the order of the dict.
+            """
+            self._swapPattern = re.compile('|'.join(re.escape(c) 
+                    for c in sorted(swapTable, key=lambda c: (-len(c), c))))
         self._register()
 
     def _register(self):
         self.block.transliterationSchemes[self.name] = self
         _names[self.name.upper()] = self
     
-    def _setupParseTree(self, rowFrom, rowTo, colIndex, tree):
+    def variant(self, schemeName, delta):
+        """ Create a variant of this transliteration scheme.
+        
+        The variant shares the character block and its characters with this
+        scheme, and has its own search tree and tables, so it only costs the
+        keys it has.
+        
+        Keyword arguments:
+        schemeName -- the name of the variant. Must be unique.
+        delta -- a dict of the keys that differ in the variant. Values are 
+                 integers corresponding to Unicode code points, or None for 
+                 keys that the variant does not have.
+        
+        Returns the new scheme, of the same class as this one.
+        
+        """
+        data = dict((equiv, char.unicodeHexValue) 
+                    for equiv, char in self.items())
+        for equiv, unicodeHexValue in delta.items():
+            if unicodeHexValue is None:
+                data.pop(equiv, None)
+            else:
+                data[equiv] = unicodeHexValue
+        return self.__class__(self.block.name, schemeName, data, 
+                              self.swapTable)
+    
+    def _setupTrie(self, keys):
         """ Build the search tree for multi-character encodings.
+        
+        Each node is a dict from the next character to the child node.
+        Nodes where a key ends also map '' (which is no character) to True,
+        so that the search can fall back to the longest complete key.
         """
-        if colIndex == self._longestEntry:
-            return
-        prevchar = None
-        rowIndex = rowFrom
-        while rowIndex <= rowTo:
-            if colIndex < len(self._parsedata[rowIndex]):
-                c = self._parsedata[rowIndex][colIndex]
-                if c != prevchar:
-                    tree[c] = {}
-                    if  prevchar is not None:
-                        self._setupParseTree(rowFrom, rowIndex - 1, colIndex + 1, tree[prevchar])
-                    rowFrom = rowIndex
-                    prevchar = c
-                if rowIndex == rowTo:
-                    self._setupParseTree(rowFrom, rowIndex, colIndex + 1, tree[prevchar])
-            rowIndex = rowIndex + 1
-                
-    def __getNextChar(self, text, startPos, tree):
-        i = startPos
-        matched = text[i]
-        if i < len(text) - 1:
-            try:
-                if text[i + 1] in tree[text[i]]:
-                    matched = matched + self.__getNextChar(text, i + 1, tree[text[i]])
-            except KeyError:
-                # Ignore. The lookup for the equivalent character later on will handle it.
-                pass
-        return matched
+        self._trie = {}
+        for key in keys:
+            node = self._trie
+            for c in key:
+                node = node.setdefault(c, {})
+            node[''] = True
     
     def _getNextChar(self, text, startPos):
-        if self._longestEntry > 1 and not text[startPos].isspace():
-            return self.__getNextChar(text, startPos, self._parseTree)
-        else:
+        """ Return the longest key at startPos, or the character there
+        if no key starts at it.
+        """
+        if self._longestEntry == 1 or text[startPos].isspace():
             return text[startPos]
+        node = self._trie
+        end = startPos + 1
+        i = startPos
+        while i < len(text):
+            node = node.get(text[i])
+            if node is None:
+                break
+            i = i + 1
+            if '' in node:
+                end = i
+        return text[startPos:end]
             
     def _preprocess(self, text):
-        if self.swapTable:
-            for c in self.swapTable:
-                text = text.replace(c, self.swapTable[c])
+        if self._swapPattern is not None:
+            swapTable = self.swapTable
+            text = self._swapPattern.sub(lambda m: swapTable[m.group()], text)
         return text
         
-            
-    def _transliterate (self, text, outFormat):
+    def _transliterate (self, text, outFormat, options=defaultOptions):
         """ Transliterate the text to Unicode."""
-        result = []
         text = self._preprocess(text)
+        if self._translator is not None:
+            return [_translate(text, self._translator, options)]
+        result = []
         i = 0
         while i < len(text):
             if text[i].isspace(): 
@@ -375,11 +536,121 @@ class TransliterationScheme(dict):
                 try:
                     result.append(self[chr].chr)
                 except KeyError:
-                    result.append(_unrecognised(chr))
+                    result.append(_unrecognised(chr, options))
                 i = i + len(chr)
         return result
 
     
+_basestring = (str, bytes)
+
+def _findFormat(fmt):
+    """ Look up a format by name; formats themselves are returned as is. """
+    if isinstance(fmt, _basestring):
+        try:
+            fmt = _names[fmt.upper()]
+        except KeyError:
+            raise ValueError('unrecognised format ' + fmt)
+    return fmt
+
+def _getBlock(format):
+    if isinstance(format, CharacterBlock):
+        return format
+    else:
+        return format.block
+
+_nonLatin1 = re.compile('[^\x00-\xff]')
+
+def _asciiEncode(text):
+    """ Replace the characters above U+00FF with HTML character references. """
+    return _nonLatin1.sub(lambda m: '&#x%x;' % ord(m.group()), text)
+
+
+class Transliterator(object):
+    """ A transliteration from one format to another, set up once.
+    
+    Looking up the formats, checking that they are compatible and merging
+    the options are done when the Transliterator is created, not on every
+    call. Use compile() to create one.
+    
+    Public attributes:
+    inFormat -- the "from" CharacterBlock or TransliterationScheme.
+    outFormat -- the target CharacterBlock or TransliterationScheme.
+    options -- the options for every call, as a read-only mapping.
+    
+    """
+    
+    def __init__(self, inFormat, outFormat, requestOptions={}):
+        """ Set up a transliteration.
+        
+        Keyword arguments:
+        inFormat -- the "from" CharacterBlock or TransliterationScheme, 
+                    or its name
+        outFormat -- the target CharacterBlock or TransliterationScheme, 
+                     or its name
+        requestOptions -- optional dict containing option settings that 
+                          override the defaults.
+        
+        Raises:
+        ValueError -- unrecognised or incompatible input and output formats.
+        
+        """
+        self.inFormat = _findFormat(inFormat)
+        self.outFormat = _findFormat(outFormat)
+        if not _getBlock(self.inFormat) is _getBlock(self.outFormat):
+            raise ValueError("incompatible input and output formats")
+        self.options = _callOptions(requestOptions)
+        # They're trying to trick us. Just do a quick sanity check & bounce 
+        # the text back.
+        self._identity = self.inFormat is self.outFormat \
+                and self.inFormat._longestEntry == 1
+    
+    def __call__(self, text):
+        """ Transliterate a text, or each text in an iterable.
+        
+        Returns the transliterated text, encoded with the outputEncoding
+        option; for an iterable of texts, returns an iterator over the
+        transliterated texts.
+        
+        Raises:
+        KeyError -- a character in text is not a member of inFormat, or has 
+        no corresponding character defined in outFormat.
+        
+        """
+        if isinstance(text, _basestring):
+            return self._transliterateOne(text)
+        return map(self._transliterateOne, text)
+    
+    def _transliterateOne(self, text):
+        if self._identity:
+            [self.inFormat[c] for c in set(text) if not c.isspace()] 
+            # -> KeyError for extraneous chars.
+            result = text
+        else:
+            result = u''.join(self.inFormat._transliterate(text, 
+                                                self.outFormat, self.options))
+        if self.options['outputASCIIEncoded']:
+            result = _asciiEncode(result)
+        return result.encode(self.options['outputEncoding'])
+    
+    
+def compile(inFormat, outFormat, **requestOptions):
+    """ Return a Transliterator from inFormat to outFormat.
+    
+    Keyword arguments:
+    inFormat -- the "from" CharacterBlock or TransliterationScheme, or its name
+    outFormat -- the target CharacterBlock or TransliterationScheme, or its
+                 name
+    requestOptions -- option settings that override the defaults for every
+                      call of the Transliterator.
+    
+    >>> toDevanagari = compile('harvardkyoto', 'devanagari')
+    >>> [t.decode('utf-8') for t in toDevanagari(['rAma', 'kRSNa'])]
+    ['राम', 'कृष्ण']
+    
+    """
+    return Transliterator(inFormat, outFormat, requestOptions)
+
+    
 def transliterate(text, inFormat, outFormat, requestOptions={}):
     """ Transliterate a text.
     
@@ -388,71 +659,24 @@ def transliterate(text, inFormat, outFormat, requestOptions={}):
     inFormat -- the "from" CharacterBlock or TransliterationScheme, or its name
     outFormat -- the target CharacterBlock or TransliterationScheme, or its name
     requestOptions -- optional dict containing option settings that override the
-                      defaults for this request.
+                      defaults for this request. The defaults in the
+                      module-level options dict are not changed.
     
     Returns a unicode object containing the text transliterated into the
     target character set.
     
+    To transliterate many texts between the same formats, use compile().
+    
     Raises:
     ValueError -- unrecognised input or output format.
+    TypeError -- text is not a string.
     KeyError -- a character in text is not a member of inFormat, or has no
     corresponding character defined in outFormat.
     
     """
-    def asciiEncode(chr):
-        value = ord(chr)
-        if value > 255:
-            return '&#x%x;' % (value)
-        return chr
-      
-    try:
-        options.update(requestOptions)
-    
-        """ Ensure we have the correct encoding for input text. """
-        # if isinstance(text, str):
-        #     text = text.decode(options['inputEncoding'])
-        basestring = (str, bytes)
-        """ Look up input & output format names. """
-        def findFormat(fmt):
-            if isinstance(fmt, basestring):
-                try:
-                    fmt = _names[fmt.upper()]
-                except KeyError:
-                    raise (ValueError, 'unrecognised format ' + fmt)
-            return fmt
-        inFormat = findFormat(inFormat)
-        outFormat = findFormat(outFormat)
-        
-        """ Perform sanity checks. """
-    
-        if not isinstance(text, basestring): 
-                raise (TypeError, "The text must be a string or a unicode object")
-        
-        def getBlock(format):
-            if isinstance(format, CharacterBlock):
-                return format
-            else:
-                return format.block
-        inBlock = getBlock(inFormat)
-        outBlock = getBlock(outFormat)
-        if not inBlock is outBlock:
-            raise (ValueError, "incompatible input and output formats")
-            
-        if inFormat is outFormat:
-            # They're trying to trick us. Just do a quick sanity check & bounce it back.
-            if inFormat._longestEntry == 1:
-                [inFormat[c] for c in Set(text) if not c.isspace()] 
-                # -> KeyError for extraneous chars.
-                return text
-            
-        """ At last we're happy. Do it. """
-            
-        result = inFormat._transliterate(text, outFormat)
-        if options['outputASCIIEncoded']:
-            result = [asciiEncode(c) for c in result]
-        return u''.join(result).encode(options['outputEncoding'])
-    finally:
-        resetOptions()
+    if not isinstance(text, _basestring): 
+        raise TypeError("The text must be a string or a unicode object")
+    return Transliterator(inFormat, outFormat, requestOptions)(text)
     
             
 """ DEVANAGARI PROCESSING
@@ -482,29 +706,20 @@ class DevanagariCharacter (TLCharacter):
     _AVAGRAHA = 0x93D
     _OM = 0x950
     
+    __slots__ = ('isVowel', 'isConsonant', '_dependentVowel')
+    
     def __init__(self, unicodeHexValue, block):
         """ Create an object representing a Devanagari character.
         
         Extends TLCharacter.__init__ to distinguish Devanagari standalone
-        vowels, dependent vowels and consonants.
-        
-        Raises 
-        ValueError -- for characters in the Devanagari dependent vowel range.
-                      We want these as variants of the corresponding standalone 
-                      vowels, not as separate characters.
+        vowels and consonants. Dependent vowels are not separate characters:
+        see DevanagariCharacterBlock._addCharacters().
         
         """
         self.isVowel = False
         if unicodeHexValue in DevanagariCharacter._vowelRange:
             self.isVowel = True
         self._dependentVowel = None
-        if unicodeHexValue in DevanagariCharacter._depVowelRange:
-            # We are a dependent vowel. 
-            # Find the corresponding normal vowel.
-            vowel = block[chr(unicodeHexValue - DevanagariCharacter._vowelOffset)]
-            vowel._setDependentVowel(unicodeHexValue)
-            raise (ValueError) # don't create dependent vowels as separate instances
-            
         TLCharacter.__init__(self, unicodeHexValue, block)
 
         self.isConsonant = False
@@ -516,62 +731,105 @@ class DevanagariCharacter (TLCharacter):
 
     def _setDependentVowel(self, unicodeHexValue):
         if unicodeHexValue is not None:
-            if not self.isVowel: raise (ValueError)
+            if not self.isVowel:
+                raise ValueError(self.chr)
             self._dependentVowel = chr(unicodeHexValue)
             self._block[chr(unicodeHexValue)] = self
             
 class _Devanagari(object):
     """ Holder class for the Devanagari transliteration algorithm. """
     
-    def _transliterate(self, text, outFormat):
+    """ Context classes of the tokens around the one being transliterated:
+    the properties of its neighbours that _equivalent() depends on.
+    _NONE is for whitespace, unrecognised tokens and the ends of the text.
+    """
+    _NONE, _VOWEL, _CONSONANT, _VIRAMA, _OTHER = range(5)
+    _NCLASSES = 5
+    
+    def _charClass(self, char):
+        if char.chr == DevanagariCharacter._VIRAMA:
+            return _Devanagari._VIRAMA
+        if char.isConsonant:
+            return _Devanagari._CONSONANT
+        if char.isVowel:
+            return _Devanagari._VOWEL
+        return _Devanagari._OTHER
+    
+    def _transitionTable(self, outFormat):
+        """ Return the transition table from this format to outFormat.
+        
+        The table maps each token of this format to a row of its
+        equivalents in outFormat, indexed by
+        prevClass * _NCLASSES + nextClass. Entries are None where
+        outFormat has no equivalent. Tables are built on first use.
+        """
+        table = self._transitionTables.get(outFormat.name)
+        if table is None:
+            table = self._buildTransitionTable(outFormat)
+            self._transitionTables[outFormat.name] = table
+        return table
+    
+    def _buildTransitionTable(self, outFormat):
+        if self._tokenClasses is None:
+            self._tokenClasses = dict((token, self._charClass(char))
+                    for token, char in self.items() if not token.isspace())
+        """ _equivalent() only looks at the class of the neighbours, so any
+        character of the class stands for all of them.
+        """
+        examples = [None] * _Devanagari._NCLASSES
+        for token, cls in sorted(self._tokenClasses.items()):
+            if examples[cls] is None:
+                examples[cls] = self[token]
+        table = {}
+        for token in self._tokenClasses:
+            char = self[token]
+            row = []
+            for prev in examples:
+                for next in examples:
+                    try:
+                        row.append(''.join(outFormat._equivalent(char, 
+                                prev, next, self._implicitA)))
+                    except KeyError:
+                        row.append(None)
+            table[token] = tuple(row)
+        return table
+    
+    def _transliterate(self, text, outFormat, options=defaultOptions):
         """ Transliterate a devanagari text into the target format.
         
         Transliterating a character to or from Devanagari is not a simple 
-        lookup: it depends on the preceding and following characters.
+        lookup: it depends on the preceding and following characters. The
+        text is split into tokens, and the equivalent of each token is
+        looked up in the transition table by the classes of its neighbours.
         """
-        def getResult(): 
-            if curMatch.isspace():
-                result.append(curMatch)
-                return
-            if prevMatch in self:
-                prev = self[prevMatch]
-            else:
-                prev = None
-            if nextMatch in self:
-                next = self[nextMatch]
-            else:
-                next = None
-            try:
-                equiv = outFormat._equivalent(self[curMatch], 
-                                                            prev, #self.get(prevMatch, None), 
-                                                            next, #self.get(nextMatch, None),
-                                                            self._implicitA)
-            except KeyError:
-                equiv = _unrecognised(curMatch)
-            for e in equiv:
-                result.append(e)
-                
-        def incr(c):
-            if self._longestEntry == 1:
-                return 1
-            return len(c)
-            
-            
-        result = []
+        table = self._transitionTable(outFormat)
+        tokenClasses = self._tokenClasses
+        nclasses = _Devanagari._NCLASSES
         text = self._preprocess(text)
+        tokens = []
         i = 0
-        prevMatch = None
-        nextMatch = None
-        curMatch = self._getNextChar(text, i)
-        i = i + len(curMatch)
         while i < len(text):
-            nextMatch = self._getNextChar(text, i)
-            getResult()
-            i = i + len(nextMatch)
-            prevMatch = curMatch
-            curMatch = nextMatch
-            nextMatch = None
-        getResult() 
+            token = self._getNextChar(text, i)
+            tokens.append(token)
+            i = i + len(token)
+        classes = [tokenClasses.get(token, _Devanagari._NONE) 
+                   for token in tokens]
+        classes.append(_Devanagari._NONE)
+        
+        result = []
+        prevClass = _Devanagari._NONE
+        for i, token in enumerate(tokens):
+            row = table.get(token)
+            equiv = None
+            if row is not None:
+                equiv = row[prevClass * nclasses + classes[i + 1]]
+            if equiv is None:
+                if token.isspace():
+                    equiv = token
+                else:
+                    equiv = _unrecognised(token, options)
+            result.append(equiv)
+            prevClass = classes[i]
         return result
 
 
@@ -587,13 +845,29 @@ class DevanagariCharacterBlock(CharacterBlock, _Devanagari):
         created should be instances of DevanagariCharacter.
         
         """
-        CharacterBlock.__init__(self, name, charRange, DevanagariCharacter)
+        self._tokenClasses = None
+        self._transitionTables = {}
         self._implicitA = True # generate implicit As when transliterating 
                                 # *FROM* this scheme
+        CharacterBlock.__init__(self, name, charRange, DevanagariCharacter)
+    
+    def _addCharacters(self, charRange, charClass):
+        """ Extends CharacterBlock._addCharacters: characters in the 
+        dependent vowel range are not created as separate characters, but
+        as variants of the corresponding standalone vowels.
+        
+        """
+        depVowels = [c for c in charRange 
+                     if c in DevanagariCharacter._depVowelRange]
+        CharacterBlock._addCharacters(self, 
+                [c for c in charRange if c not in depVowels], charClass)
+        for c in depVowels:
+            vowel = self[chr(c - DevanagariCharacter._vowelOffset)]
+            vowel._setDependentVowel(c)
         
-    def _transliterate(self, text, outFormat):
+    def _transliterate(self, text, outFormat, options=defaultOptions):
         """ Need to specify which superclass _transliterate() to call. """
-        return _Devanagari._transliterate(self, text, outFormat)
+        return _Devanagari._transliterate(self, text, outFormat, options)
     
     def _equivalent(self, char, prev, next, implicitA):
         """ Transliterate a Latin character equivalent to Devanagari.
@@ -627,14 +901,16 @@ class DevanagariTransliterationScheme(TransliterationScheme, _Devanagari):
         Extends TransliterationScheme.__init__
         
         """
-        TransliterationScheme.__init__\
-                (self, blockName, schemeName, data, swapTable)
+        self._tokenClasses = None
+        self._transitionTables = {}
         self._implicitA = False # generate implicit As when transliterating 
                                 # *FROM* this scheme
+        TransliterationScheme.__init__\
+                (self, blockName, schemeName, data, swapTable)
 
-    def _transliterate(self, text, outFormat):
+    def _transliterate(self, text, outFormat, options=defaultOptions):
         """ Need to specify which superclass _transliterate() to call. """
-        return _Devanagari._transliterate(self, text, outFormat)
+        return _Devanagari._transliterate(self, text, outFormat, options)
 
     def _equivalent(self, char, prev, next, implicitA):
         """ Transliterate a Devanagari character to Latin.
@@ -667,7 +943,8 @@ IAST
 
 """
 
-DevanagariCharacterBlock('DEVANAGARI', list(range(0x900, 0x97F)))
+_lazy('DEVANAGARI', DevanagariCharacterBlock, 
+      'DEVANAGARI', list(range(0x900, 0x97F)))
 
 HARVARDKYOTO = { \
     'M': 0x902,
@@ -728,7 +1005,21 @@ HARVARDKYOTO = { \
     "'": 0x93D,
     'oM': 0x950,
      }
-DevanagariTransliterationScheme('DEVANAGARI','HARVARDKYOTO', HARVARDKYOTO)
+_lazy('HARVARDKYOTO', DevanagariTransliterationScheme, 
+      'DEVANAGARI', 'HARVARDKYOTO', HARVARDKYOTO)
+
+""" The Harvard Kyoto of transliterator_tam: e and o are the letters that 
+are E and O in Harvard Kyoto, and there are no E, O, n2 and r2.
+"""
+_HARVARDKYOTO_TAMIL = {
+    'e': 0x90F,
+    'E': None,
+    'o': 0x913,
+    'O': None,
+    'n2': None,
+    'r2': None,
+     }
+_lazyVariant('HARVARDKYOTO_TAMIL', 'HARVARDKYOTO', _HARVARDKYOTO_TAMIL)
      
 ITRANS = { \
     'M': 0x902,
@@ -825,7 +1116,8 @@ choice for outbound anyway because it has so many ambiguities)
 _swapTable = {'GY': 'j~n', 'dny': 'j~n', 'x': 'kSh',
                     }
 
-DevanagariTransliterationScheme('DEVANAGARI', 'ITRANS', ITRANS, _swapTable)
+_lazy('ITRANS', DevanagariTransliterationScheme, 
+      'DEVANAGARI', 'ITRANS', ITRANS, _swapTable)
 
 IAST = { \
     chr(0x1E43): 0x902,
@@ -893,7 +1185,7 @@ IAST = { \
     '9': 0x096F,
      }
 
-DevanagariTransliterationScheme('DEVANAGARI', 'IAST', IAST)
+_lazy('IAST', DevanagariTransliterationScheme, 'DEVANAGARI', 'IAST', IAST)
 
 
 """ CYRILLIC DATA
@@ -906,7 +1198,7 @@ anybody ever has occasion to use it.
 
 """
 
-CharacterBlock('CYRILLIC', list(range(0x400, 0x510)))
+_lazy('CYRILLIC', CharacterBlock, 'CYRILLIC', list(range(0x400, 0x510)))
 
 _ISO9RUS = {\
 	chr(0x0CB): 0x401, # IO
@@ -977,49 +1269,202 @@ _ISO9RUS = {\
 	chr(0x0EB): 0x451, #  io
     }
 
-TransliterationScheme('CYRILLIC', 'ISO9RUS', _ISO9RUS)
+_lazy('ISO9RUS', TransliterationScheme, 'CYRILLIC', 'ISO9RUS', _ISO9RUS)
 
-def main(argv=None):
-    """ Call transliterator from a command line.
+""" SANSCRIPT
+
+Adapter from the Devanagari transliteration schemes of this module to the 
+schemes of indic_transliteration.sanscript.
+
+"""
+
+def sanscriptScheme(scheme):
+    """ Convert a Devanagari transliteration scheme to a sanscript.Scheme.
+    
+    The result can be used with sanscript.SchemeMap and 
+    sanscript.transliterate(), together with sanscript's Devanagari 
+    scheme:
+    
+    >>> from indic_transliteration import sanscript
+    >>> scheme_map = sanscript.SchemeMap(sanscriptScheme('harvardkyoto'), 
+    ...     sanscript.SCHEMES[sanscript.DEVANAGARI])
+    >>> sanscript.transliterate('rAma', scheme_map=scheme_map) == 'राम'
+    True
+    
+    Each entry of sanscript's Devanagari scheme is given the key that this 
+    scheme transliterates the character to, and the other keys for the 
+    character as synonyms. Conjuncts get the keys of their consonants.
+    Entries for characters that the scheme has no key for are the 
+    characters themselves. Entries of the swap table are synonyms of the 
+    key they are replaced with, if there is one.
+    
+    Two differences from this module remain. From Devanagari, sanscript 
+    writes the implicit a of consonants, which this module leaves out. 
+    And sanscript's Devanagari scheme has the ASCII digits, so digits are 
+    not transliterated: '12' stays '12' and '१२' stays '१२', where this 
+    module turns ITRANS and IAST digits into Devanagari ones and back.
+    
+    Keyword arguments:
+    scheme -- a DevanagariTransliterationScheme, or its name.
+    
+    Raises:
+    ValueError -- scheme is not a Devanagari transliteration scheme.
     
-    python transliterator.py text inputFormat outputFormat
+    """
+    from indic_transliteration import sanscript
+    
+    scheme = _findFormat(scheme)
+    if not isinstance(scheme, DevanagariTransliterationScheme):
+        raise ValueError('not a Devanagari transliteration scheme: %s' 
+                         % scheme.name)
+    keys = {}
+    for equiv, char in scheme.items():
+        keys.setdefault(char.chr, []).append(equiv)
     
-    ... writes the transliterated text to stdout
+    def findKey(text):
+        key = []
+        for c in text:
+            if c == DevanagariCharacter._VIRAMA:
+                continue
+            char = scheme.block.get(c)
+            if char is None or scheme.name not in char.equivalents:
+                return None
+            key.append(char.equivalents[scheme.name])
+        return ''.join(key)
     
-    text -- the text to be transliterated OR the name of a file containing the text
-    inputFormat -- the name of the character block or transliteration scheme that
-                   the text is to be transliterated FROM, e.g. 'CYRILLIC', 'IAST'.
-                   Not case-sensitive
-    outputFormat -- the name of the character block or transliteration scheme that
-                   the text is to be transliterated TO, e.g. 'CYRILLIC', 'IAST'.
-                   Not case-sensitive
+    data = {}
+    synonyms = {}
+    entryKeys = {}
+    devanagari = sanscript.SCHEMES[sanscript.DEVANAGARI]
+    for group, entries in devanagari.items():
+        if group == 'virama':
+            data[group] = ['']
+            continue
+        data[group] = []
+        for entry in entries:
+            key = findKey(entry)
+            if key is None:
+                key = entry
+            elif len(entry) == 1:
+                others = [equiv for equiv in keys[scheme.block[entry].chr] 
+                          if equiv != key]
+                if others:
+                    synonyms[key] = others
+            entryKeys.setdefault(entry, key)
+            data[group].append(key)
+    for equiv, replacement in sorted((scheme.swapTable or {}).items()):
+        entry = ''.join(scheme._transliterate(replacement, scheme.block))
+        key = entryKeys.get(entry.rstrip(DevanagariCharacter._VIRAMA))
+        if key is not None:
+            synonyms.setdefault(key, []).append(equiv)
+    return sanscript.Scheme(data, synonym_map=synonyms)
     
+
+""" COMMAND LINE """
+
+""" Number of lines sent to a worker process at a time. """
+_BATCH_LINES = 1000
+
+_workerTransliterator = None
+
+def _initWorker(inFormat, outFormat):
+    global _workerTransliterator
+    _workerTransliterator = compile(inFormat, outFormat)
+
+def _transliterateLines(lines):
+    """ Transliterate a batch of lines in a worker process. """
+    return b''.join(line + b'\n' for line in _workerTransliterator(lines))
+
+def _readLines(f, skipComments=False):
+    """ Yield the lines of f to transliterate, without their newlines, and
+    without the lines starting with '#' if skipComments is true.
     """
-    print (transliterate('jaya gaNeza! zrIrAmajayam', 'harvardkyoto', 'devanagari'))
+    for line in f:
+        if not (skipComments and line.startswith('#')):
+            yield line.rstrip('\n')
+
+def _batches(lines, size):
+    lines = iter(lines)
+    while True:
+        batch = list(itertools.islice(lines, size))
+        if not batch:
+            return
+        yield batch
+
+def main(argv=None, formatName=None):
+    """ Call transliterator from a command line.
+    
+    See COMMAND LINE USAGE in the module documentation. formatName, if 
+    given, maps the format names on the command line to the ones to use.
+    
+    """
+    # imported here to keep them out of the import time of the module
+    import argparse
+    import contextlib
+    import multiprocessing
+    
     if argv is None:
         argv = sys.argv
-    try:    
-        text, inFormat, outFormat = argv[1:4]
-    except ValueError:
-        print (main.__doc__)
-        return 2
-    inFormat = inFormat.upper()
-    outFormat = outFormat.upper()
-    # try assuming "text" is a filename
+    parser = argparse.ArgumentParser(prog=os.path.basename(argv[0]),
+            description='Transliterate a text, a file or stdin.')
+    parser.add_argument('text', nargs='?', default='-',
+            help="the text, or the name of a file containing it, or '-' "
+                 "for stdin (the default)")
+    parser.add_argument('inputFormat', 
+            help='the format to transliterate from, e.g. IAST')
+    parser.add_argument('outputFormat', 
+            help='the format to transliterate to, e.g. DEVANAGARI')
+    parser.add_argument('-o', '--output', 
+            help='the file to write to (default: stdout)')
+    parser.add_argument('-j', '--processes', type=int, default=1,
+            help='the number of processes to transliterate files in')
+    args = parser.parse_args(argv[1:])
+    if formatName is not None:
+        args.inputFormat = formatName(args.inputFormat)
+        args.outputFormat = formatName(args.outputFormat)
+    
     try:
-        f = open(text)
-    except IOError:
-        # it wasn't, so it must be the actual text
-        print (transliterate(text, inFormat, outFormat))
-        return 0
+        transliterator = compile(args.inputFormat, args.outputFormat)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    isFile = False
+    if args.text == '-':
+        f = io.TextIOWrapper(sys.stdin.buffer, 
+                             encoding=transliterator.options['inputEncoding'])
     else:
-        i = 1
-        for text in f.readlines():
-            if len(text) > 0 and not text.startswith('#'):
-                print (transliterate(text, inFormat, outFormat).strip('\n'))
-            i = i + 1
-        f.close()
-        return 0
+        # try assuming "text" is a filename
+        try:
+            f = open(args.text, 
+                     encoding=transliterator.options['inputEncoding'])
+            isFile = True
+        except IOError:
+            # it wasn't, so it must be the actual text
+            f = io.StringIO(args.text)
+    
+    with contextlib.ExitStack() as stack:
+        if args.text == '-':
+            # detach the wrapper rather than close it, which would close stdin
+            stack.callback(f.detach)
+        else:
+            stack.enter_context(f)
+        if args.output is None:
+            out = sys.stdout.buffer
+        else:
+            out = stack.enter_context(open(args.output, 'wb'))
+        lines = _readLines(f, skipComments=isFile)
+        if args.processes > 1:
+            with multiprocessing.Pool(args.processes, _initWorker, 
+                    (args.inputFormat, args.outputFormat)) as pool:
+                for chunk in pool.imap(_transliterateLines, 
+                                       _batches(lines, _BATCH_LINES)):
+                    out.write(chunk)
+        else:
+            for result in transliterator(lines):
+                out.write(result)
+                out.write(b'\n')
+        out.flush()
+    return 0
             
 if __name__ == "__main__":
     sys.exit(main())
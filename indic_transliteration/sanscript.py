@@ -50,12 +50,14 @@ These variables are documented below.
 
 from __future__ import unicode_literals
 
+import sys
+
+from indic_transliteration import detect
+
 # Brahmic schemes
 # ---------------
 #: Internal name of Bengali. Bengali ``ba`` and ``va`` are both rendered
 #: as `ব`.
-import sys
-
 BENGALI = 'bengali'
 
 #: Internal name of Devanagari.
@@ -108,8 +110,38 @@ VELTHUIS = 'velthuis'
 #: Internal name of WX.
 WX = 'wx'
 
+#: Pseudo-scheme for :func:`transliterate`: detect the source scheme from
+#: the data itself.
+AUTO = 'auto'
+
+#: Number of leading characters that :data:`AUTO` inspects.
+AUTO_SAMPLE_LENGTH = 1000
+
 SCHEMES = {}
 
+#: Maps the scheme names of :mod:`indic_transliteration.detect` to ours.
+#: Kolkata and Velthuis are detected but have no scheme in :data:`SCHEMES`.
+_DETECTED_SCHEMES = {
+  detect.Scheme.Bengali: BENGALI,
+  detect.Scheme.Devanagari: DEVANAGARI,
+  detect.Scheme.Gujarati: GUJARATI,
+  detect.Scheme.Gurmukhi: GURMUKHI,
+  detect.Scheme.Kannada: KANNADA,
+  detect.Scheme.Malayalam: MALAYALAM,
+  detect.Scheme.Oriya: ORIYA,
+  detect.Scheme.Tamil: TAMIL,
+  detect.Scheme.Telugu: TELUGU,
+  detect.Scheme.HK: HK,
+  detect.Scheme.IAST: IAST,
+  detect.Scheme.ITRANS: ITRANS,
+  detect.Scheme.Kolkata: KOLKATA,
+  detect.Scheme.SLP1: SLP1,
+  detect.Scheme.Velthuis: VELTHUIS,
+}
+
+#: :class:`SchemeMap` objects built for :data:`AUTO`, keyed by scheme names.
+_auto_scheme_maps = {}
+
 
 class Scheme(dict):
   """Represents all of the data associated with a given scheme. In addition
@@ -324,17 +356,29 @@ def transliterate(data, _from=None, _to=None, scheme_map=None, **kw):
       scheme_map = SchemeMap(SCHEMES[HK], SCHEMES[DEVANAGARI])
       output = transliterate('idam adbhutam', scheme_map=scheme_map)
 
+  If the source scheme is unknown, pass :data:`AUTO` as `_from`. The scheme
+  is then detected from the first :data:`AUTO_SAMPLE_LENGTH` characters of
+  `data`, and the resulting :class:`SchemeMap` is cached::
+
+      output = transliterate('idam adbhutam', AUTO, DEVANAGARI)
+
+  Detected schemes that are not in :data:`SCHEMES`, such as Kolkata and
+  Velthuis, raise :class:`ValueError`.
+
   :param data: the data to transliterate
-  :param _from: the name of a source scheme
+  :param _from: the name of a source scheme, or :data:`AUTO`
   :param _to: the name of a destination scheme
   :param scheme_map: the :class:`SchemeMap` to use. If specified, ignore
                      `_from` and `_to`. If unspecified, create a
                      :class:`SchemeMap` from `_from` to `_to`.
   """
   if scheme_map is None:
-    from_scheme = SCHEMES[_from]
-    to_scheme = SCHEMES[_to]
-    scheme_map = SchemeMap(from_scheme, to_scheme)
+    if _from == AUTO:
+      scheme_map = _auto_scheme_map(data, _to)
+    else:
+      from_scheme = SCHEMES[_from]
+      to_scheme = SCHEMES[_to]
+      scheme_map = SchemeMap(from_scheme, to_scheme)
 
   options = {
     'togglers': set(['##']),
@@ -347,6 +391,30 @@ def transliterate(data, _from=None, _to=None, scheme_map=None, **kw):
   return func(data, scheme_map, **options)
 
 
+def _auto_scheme_map(data, _to):
+  """Return a :class:`SchemeMap` from the detected scheme of `data` to `_to`.
+
+  Maps are cached by scheme name. A cached map is reused only while
+  :data:`SCHEMES` still holds the schemes it was built from.
+
+  :raises ValueError: if the detected scheme is not in :data:`SCHEMES`.
+  """
+  detected = detect.detect(data[:AUTO_SAMPLE_LENGTH])
+  _from = _DETECTED_SCHEMES[detected]
+  if _from not in SCHEMES:
+    raise ValueError('Detected scheme %s is not supported' % detected)
+  from_scheme = SCHEMES[_from]
+  to_scheme = SCHEMES[_to]
+  key = (_from, _to)
+  cached = _auto_scheme_maps.get(key)
+  # Compare by identity so that a replaced SCHEMES entry is picked up.
+  if cached and cached[0] is from_scheme and cached[1] is to_scheme:
+    return cached[2]
+  scheme_map = SchemeMap(from_scheme, to_scheme)
+  _auto_scheme_maps[key] = (from_scheme, to_scheme, scheme_map)
+  return scheme_map
+
+
 def _setup():
   """Add a variety of default schemes."""
   s = str.split
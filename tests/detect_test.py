@@ -8,9 +8,12 @@
     :license: MIT and BSD
 """
 
+import unicodedata
+
 import pytest
 
-from indic_transliteration.detect import detect, Scheme as S
+from indic_transliteration.detect import detect, detect_encoding, segment, \
+    Scheme as S
 
 
 def add(testcases, scheme, items):
@@ -208,3 +211,78 @@ def test_noisy(data):
     text, scheme = data
     text = ''.join([noise, text, noise])
     assert detect(text) == scheme
+
+
+def test_dandas():
+    # Dandas also punctuate romanized text.
+    assert detect('rAma । kRSNa ॥') == S.HK
+    assert detect('rāmaḥ । kṛṣṇaḥ ॥') == S.IAST
+    assert detect('राम ।') == S.Devanagari
+
+
+SEGMENTS = [
+    ('', []),
+    ('rAma', [(0, 4, S.HK)]),
+    ('पितॄन्', [(0, 6, S.Devanagari)]),
+    ('iti पितॄन्', [(0, 3, S.HK), (3, 10, S.Devanagari)]),
+    ('पितॄन् iti', [(0, 6, S.Devanagari), (6, 10, S.HK)]),
+    ('पितॄन् । পিতৄন্ ॥', [(0, 6, S.Devanagari), (6, 17, S.Bengali)]),
+    ('"पितॄन्" means pitṝn.', [(0, 7, S.Devanagari), (7, 21, S.IAST)]),
+    (' 1234 ', [(0, 6, S.HK)]),
+    # combining marks stay with the letter before them
+    (unicodedata.normalize('NFD', 'ṛ पि'),
+     [(0, 2, S.IAST), (2, 5, S.Devanagari)]),
+    # digits are neutral, Brahmic ones included
+    ('rAma १२ राम', [(0, 4, S.HK), (4, 11, S.Devanagari)]),
+    ('१२३', [(0, 3, S.Devanagari)]),
+    # letters that are neither Latin nor Brahmic get no scheme
+    ('rAma Москва राम',
+     [(0, 4, S.HK), (4, 11, None), (11, 15, S.Devanagari)]),
+    ('Σ あア rAma', [(0, 4, None), (4, 9, S.HK)]),
+]
+
+
+@pytest.mark.parametrize('data', SEGMENTS)
+def test_segment(data):
+    text, spans = data
+    assert segment(text) == spans
+
+
+@pytest.mark.parametrize('data', BASIC)
+def test_segment_single_scheme(data):
+    text, scheme = data
+    if text:
+        assert segment(text) == [(0, len(text), scheme)]
+
+
+ENCODINGS = [
+    (b'', ('ascii', None)),
+    (b'pitRRIn', ('ascii', S.ITRANS)),
+    ('pitṝn'.encode('utf-8'), ('utf-8', S.IAST)),
+    ('पितॄन्'.encode('utf-8'), ('utf-8', S.Devanagari)),
+    (b'\xb3\xda\xcc \xea', ('iscii', None)),
+    (b'abc \xef\x42\xb3\xda\xef\x44\xcc', ('iscii', S.Devanagari)),
+    (b'\xef\x4b\xb3\xda', ('iscii', S.Gurmukhi)),
+    (b'caf\xff', (None, None)),
+]
+
+
+@pytest.mark.parametrize('data', ENCODINGS)
+def test_detect_encoding(data):
+    raw, expected = data
+    assert detect_encoding(raw) == expected
+
+
+def test_detect_encoding_sample():
+    raw = b'\xb3\xda' * 10 + b'\xff'
+    assert detect_encoding(raw, 20) == ('iscii', None)
+    assert detect_encoding(raw, 21) == (None, None)
+
+
+def test_detect_encoding_truncated():
+    raw = 'পিতৄন্'.encode('utf-8')
+    # A multi-byte sequence cut off by the end of the sample...
+    assert detect_encoding(raw, 4) == ('utf-8', S.Bengali)
+    # ...but not by the end of the data.
+    assert detect_encoding(raw[:4]) == ('iscii', None)
+    assert detect_encoding(raw[:4], 4) == ('utf-8', S.Bengali)
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+    test
+    ~~~~
+
+    Tests for iscii2utf8.py
+
+    :license: BSD
+"""
+
+import codecs
+import io
+import random
+
+import pytest
+
+from indic_transliteration import iscii2utf8
+
+
+DECODED = [
+    (b'', ''),
+    (b'abc 123\n', 'abc 123\n'),
+    (b'\xb3\xda\xcc', 'काम'),
+    (b'\xcc\xd7\xe8\xc2', 'मस्त'),
+    (b'\xea \xea\xea', '। ॥'),
+    # nukta specials
+    (b'\xb3\xe9\xbf\xe9', '\u0958\u095c'),
+    # halant halant, halant nukta
+    (b'\xb3\xe8\xe8\xd7\xb3\xe8\xe9\xd7', 'क्\u200cसक्\u200dस'),
+    # INV
+    (b'\xd9\xdb', '\u200d'),
+    # ATR switches
+    (b'\xb3\xef\x44\xb3\xef\x43\xb3', 'कகক'),
+    # an ATR without its script code
+    (b'\xb3\xef', 'क'),
+]
+
+
+@pytest.mark.parametrize('data', DECODED)
+def test_decode(data):
+    raw, text = data
+    assert raw.decode('iscii-devanagari') == text
+
+
+@pytest.mark.parametrize('name', ['iscii-devanagari', 'ISCII_Devanagari',
+                                  'iscii-tamil', 'iscii-assamese'])
+def test_lookup(name):
+    assert codecs.lookup(name).name == name.lower().replace('_', '-')
+
+
+def test_unknown_codec():
+    with pytest.raises(LookupError):
+        codecs.lookup('iscii-latin')
+
+
+def test_script():
+    assert b'\xb3\xda'.decode('iscii-telugu') == 'కా'
+
+
+@pytest.mark.parametrize('data', DECODED)
+def test_chunks(data):
+    raw, text = data
+    for i in range(len(raw) + 1):
+        decoder = codecs.getincrementaldecoder('iscii-devanagari')()
+        assert decoder.decode(raw[:i]) + decoder.decode(raw[i:], True) == text
+
+
+def test_random_chunks():
+    rnd = random.Random(0)
+    for _ in range(50):
+        raw = bytes(rnd.choice([rnd.randrange(0xa0, 0x100), 0x20, 0xe8, 0xe9,
+                                0xea, 0xef, 0xf0, 0xd9,
+                                rnd.randrange(0x42, 0x4c)])
+                    for _ in range(200))
+        for errors in ('ignore', 'replace'):
+            text = raw.decode('iscii-devanagari', errors)
+            cuts = sorted(rnd.randrange(len(raw)) for _ in range(5))
+            decoder = codecs.getincrementaldecoder('iscii-devanagari')(errors)
+            out = ''.join(decoder.decode(raw[start:end])
+                          for start, end in zip([0] + cuts, cuts + [None]))
+            assert out + decoder.decode(b'', True) == text
+
+
+@pytest.mark.parametrize('data', [
+    ('strict', None),
+    ('ignore', '\u0915\u093e\u0958\u0b95'),
+    ('replace', '\u0915\ufffd\u093e\u0915\ufffd\u093c\ufffd\u0b95'),
+    ('backslashreplace', '\u0915\\xff\u093e\u0915\\xff\u093c\\xfb\u0b95'),
+])
+def test_decode_errors(data):
+    # 0xff and 0xfb are invalid; the ATR applies to the byte after 0xfb
+    raw = b'\xb3\xff\xda\xb3\xff\xe9\xef\xfb\x44\xb3'
+    errors, text = data
+    if text is None:
+        with pytest.raises(UnicodeDecodeError) as info:
+            raw.decode('iscii-devanagari', errors)
+        assert info.value.start == 1
+    else:
+        assert raw.decode('iscii-devanagari', errors) == text
+
+
+def test_decode_surrogateescape():
+    raw = b'\xb3\xff\xda'
+    text = raw.decode('iscii-devanagari', 'surrogateescape')
+    assert text == '\u0915\udcff\u093e'
+    assert text.encode('iscii-devanagari', 'surrogateescape') == raw
+
+
+def test_state():
+    raw = b'\xef\x44\xb3\xb3\xe8\xda'
+    decoder = codecs.getincrementaldecoder('iscii-devanagari')()
+    assert decoder.getstate() == (b'', 0)
+    assert decoder.decode(raw[:4]) == '\u0b95'
+    state = decoder.getstate()
+    assert state == (b'\xb3', 6)
+
+    other = codecs.getincrementaldecoder('iscii-devanagari')()
+    other.setstate(state)
+    assert other.decode(raw[4:], True) == decoder.decode(raw[4:], True)
+
+
+def test_open(tmpdir):
+    raw = b'\xb3\xda\xcc \xea\xea\n\xef\x44\xb3\xdb\n' * 1000
+    path = tmpdir.join('text.isc')
+    path.write_binary(raw)
+    with open(str(path), encoding='iscii-devanagari') as f:
+        assert f.read() == raw.decode('iscii-devanagari')
+
+
+def test_split_file():
+    raw = b'\xb3\xda\n\xef\x44\xb3\n\xea\xef\n\xb3\n\xb3'
+    slices = list(iscii2utf8.split_file(raw, 1, 1))
+    # no split after the newline that is the argument of an ATR
+    assert slices == [(0, 3, 1), (3, 7, 1), (7, 12, 6), (12, 13, 6)]
+
+
+def convert_slices(raw, script, size):
+    out = []
+    for start, end, i in iscii2utf8.split_file(raw, script, size):
+        parser = iscii2utf8.Parser()
+        parser.set_script(i)
+        parser.iscii2utf8(raw[start:end], 1)
+        out.append(parser.read_output())
+    return ''.join(out)
+
+
+@pytest.mark.parametrize('raw', [
+    # the ATR applies to the first valid byte after it
+    b'\xef\xee\x48\xb3\n\xb3',
+    b'\xb3\n\xef\xfb\x44\n\xb3\n\xb3',
+    # the newline after skipped bytes is the argument of the ATR
+    b'\xb3\xef\xfb\n\x44\xb3\n\xb3',
+    # an ATR that is the argument of an EXT switches nothing
+    b'\xf0\xef\x44\n\xb3\n\xb3',
+])
+def test_split_file_invalid(raw):
+    assert convert_slices(raw, 1, 1) == raw.decode('iscii-devanagari',
+                                                   'ignore')
+
+
+def test_split_file_random():
+    rnd = random.Random(0)
+    # newlines, letters, modifying bytes, ATR, EXT, INV, bytes that are
+    # invalid in some scripts and ATR arguments
+    alphabet = (b'\n\n\n\xb3\xcc\xda\xe8\xe9\xea\xd9\xef\xf0'
+                b'\xfb\xee\xc7\x40\x42\x44\x48')
+    for _ in range(200):
+        raw = bytes(rnd.choice(alphabet) for _ in range(rnd.randint(1, 60)))
+        size = rnd.randint(1, 10)
+        assert convert_slices(raw, 1, size) == \
+            raw.decode('iscii-devanagari', 'ignore'), (raw, size)
+
+
+@pytest.mark.parametrize('size', [1, 7, 1000])
+def test_convert_file(tmpdir, size):
+    raw = 100 * \
+        b'\xb3\xda\xcc \xea\xea\n\xef\x44\xb3\xdb\n\xef\x42\xcc\xe8\n'
+    src = tmpdir.join('text.isc')
+    src.write_binary(raw)
+    dest = tmpdir.join('text.txt')
+    iscii2utf8.convert_file(str(src), str(dest), 1, processes=2, size=size)
+    assert dest.read_binary().decode('utf-8') == raw.decode('iscii-devanagari')
+
+
+def test_convert_file_invalid(tmpdir):
+    raw = b'\xb3\n\xef\xfb\x44\n\xb3\n\xb3'
+    src = tmpdir.join('text.isc')
+    src.write_binary(raw)
+    dest = tmpdir.join('text.txt')
+    iscii2utf8.convert_file(str(src), str(dest), 1, processes=2, size=1)
+    assert dest.read_binary().decode('utf-8') == 'क\n\nக\nக'
+
+
+def test_convert_empty_file(tmpdir):
+    src = tmpdir.join('empty.isc')
+    src.write_binary(b'')
+    dest = tmpdir.join('empty.txt')
+    iscii2utf8.convert_file(str(src), str(dest), 1)
+    assert dest.read_binary() == b''
+
+
+@pytest.mark.parametrize('data', DECODED)
+def test_write_output(data):
+    raw, text = data
+    stream = io.BytesIO()
+    parser = iscii2utf8.Parser()
+    parser.set_script(1)
+    for i in range(len(raw)):
+        parser.iscii2utf8(raw[i:i + 1])
+        parser.write_output(stream)
+    parser.iscii2utf8(b'', 1)
+    parser.write_output(stream)
+    assert stream.getvalue() == text.encode('utf-8')
+    assert not parser.dest
+
+
+@pytest.mark.parametrize('data', DECODED)
+def test_encode(data):
+    raw, text = data
+    assert text.encode('iscii-devanagari').decode('iscii-devanagari') == text
+
+
+ENCODED = [
+    ('काम । मस्त॥', b'\xb3\xda\xcc \xea \xcc\xd7\xe8\xc2\xea\xea'),
+    ('क़ड़', b'\xb3\xe9\xbf\xe9'),
+    ('क्\u200cसक्\u200dस', b'\xb3\xe8\xe8\xd7\xb3\xe8\xe9\xd7'),
+    # an ATR only where the script changes; dandas are common to all
+    ('कகக। க\nক', b'\xb3\xef\x44\xb3\xb3\xea \xb3\n\xef\x43\xb3'),
+    ('কাম।', b'\xef\x43\xb3\xda\xcc\xea'),
+    ('ড়', b'\xef\x43\xbf\xe9'),
+    # a ZWJ that does not follow a halant is INV INV
+    ('\u200d', b'\xd9\xd9'),
+    ('क\u200dख', b'\xb3\xd9\xd9\xb4'),
+]
+
+
+@pytest.mark.parametrize('data', ENCODED)
+def test_encode_bytes(data):
+    text, raw = data
+    assert text.encode('iscii-devanagari') == raw
+    assert raw.decode('iscii-devanagari') == text
+
+
+def test_encode_script():
+    assert 'కా'.encode('iscii-telugu') == b'\xb3\xda'
+
+
+@pytest.mark.parametrize('name', sorted(iscii2utf8.CODEC_SCRIPTS))
+def test_encode_codecs(name):
+    codec = 'iscii-' + name
+    # the letters and signs, each on its own and after a consonant
+    for x in range(0xA1, 0xEB):
+        for raw in (bytes([x]), bytes([0xB3, x])):
+            text = raw.decode(codec, 'ignore')
+            assert text.encode(codec).decode(codec) == text, raw
+            if len(text) == len(raw):
+                assert text.encode(codec) == raw
+
+
+def test_assamese():
+    # the two bytes in which assamese differs from bengali
+    assert b'\xcf\xd4'.decode('iscii-assamese') == '\u09f0\u09f1'
+    assert '\u09f0\u09f1'.encode('iscii-assamese') == b'\xcf\xd4'
+    assert b'\xcf'.decode('iscii-bengali') == '\u09b0'
+    assert b'\xcf'.decode('iscii-tamil') == '\u0bb0'
+    assert '\u0bb0'.encode('iscii-tamil') == b'\xcf'
+    assert 'ক\u09f0'.encode('iscii-devanagari') == \
+        b'\xef\x43\xb3\xef\x46\xcf'
+    assert b'\xef\x46\xcf\xef\x43\xcf'.decode('iscii-devanagari') == \
+        '\u09f0\u09b0'
+
+
+@pytest.mark.parametrize('text', ['a\u200cb', 'caf\xe9', '\u0d80'])
+def test_encode_invalid(text):
+    with pytest.raises(UnicodeEncodeError):
+        text.encode('iscii-devanagari')
+    assert text.encode('iscii-devanagari', 'replace').count(b'?') == 1
+
+
+@pytest.mark.parametrize('data', ENCODED)
+def test_encode_chunks(data):
+    text, raw = data
+    for i in range(len(text) + 1):
+        encoder = codecs.getincrementalencoder('iscii-devanagari')()
+        assert encoder.encode(text[:i]) + encoder.encode(text[i:], True) == raw
+
+        other = codecs.getincrementalencoder('iscii-devanagari')()
+        encoder.reset()
+        encoder.encode(text[:i])
+        other.setstate(encoder.getstate())
+        assert other.encode(text[i:], True) == encoder.encode(text[i:], True)
+
+
+def test_statistics():
+    raw = b'\xb3\xfb\xef\x45\xb3\xef\x41\xf0\xbf\xf0\xa1\xd9\xdb\xfb\xfc'
+    parser = iscii2utf8.Parser(max_errors=2)
+    parser.set_script(1)
+    parser.iscii2utf8(raw[:5])
+    parser.iscii2utf8(raw[5:], 1)
+    assert parser.statistics() == {
+        'bytes_in': len(raw),
+        'chars_out': len(parser.read_output()),
+        'invalid': {0xfb: 2, 0xfc: 1},
+        'atr': {0: 1, 7: 1},
+        'ext': 2,
+        'ext_invalid': 2,
+        'inv': 1,
+        'errors': 2,
+    }
+    # only the last errors are kept
+    assert list(parser.errors) == [(13, 0xfb, 'invalid iscii char'),
+                                   (14, 0xfc, 'invalid iscii char')]
+
+
+def test_no_error_log():
+    parser = iscii2utf8.Parser()
+    parser.iscii2utf8(b'\xfb\xfb', 1)
+    assert parser.statistics()['invalid'] == {0xfb: 2}
+    assert not parser.errors
+
+
+def test_iscii2scheme():
+    raw = (b'\xb3\xda\xcc \xcc\xd7\xe8\xc2 \xea\xea\n'
+           b'\xef\x45\xb3\xda\xcc \xef\x42\xb3\xe8\xb3')
+    assert ''.join(iscii2utf8.iscii2scheme([raw], 'iast')) == \
+        'kāma masta ॥\nkāma kka'
+    # a consonant at the end of a chunk is kept for the next one
+    for i in range(len(raw) + 1):
+        chunks = [raw[:i], raw[i:]]
+        assert ''.join(iscii2utf8.iscii2scheme(chunks, 'iast')) == \
+            'kāma masta ॥\nkāma kka'
+
+
+def test_iscii2scheme_script():
+    assert ''.join(iscii2utf8.iscii2scheme([b'\xb3\xda\xcc'], 'hk',
+                                           script=7)) == 'kAma'
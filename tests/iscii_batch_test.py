@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+    test
+    ~~~~
+
+    Tests for iscii_batch.py
+
+    :license: BSD
+"""
+
+import json
+import os
+
+from indic_transliteration import iscii_batch
+
+
+FILES = {
+    'a.isc': b'\xb3\xda\xcc \xea\n',
+    os.path.join('sub', 'b.isc'): b'\xef\x44\xb3\xda\xcc\n',
+    os.path.join('sub', 'c.txt'): 'काम\n'.encode('utf-8'),
+    'd.bin': b'\xff\xfe\x00',
+}
+
+
+def make_tree(tmpdir):
+    src = tmpdir.join('src')
+    for name, data in FILES.items():
+        src.join(name).write_binary(data, ensure=True)
+    return str(src), str(tmpdir.join('dest'))
+
+
+def test_convert_tree(tmpdir):
+    src, dest = make_tree(tmpdir)
+    counts = iscii_batch.convert_tree(src, dest, processes=2)
+    assert counts == {'converted': 2, 'copied': 1, 'failed': 1}
+
+    def read(name):
+        with open(os.path.join(dest, name), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    assert read('a.isc') == 'काम ।\n'
+    assert read(os.path.join('sub', 'b.isc')) == 'காம\n'
+    assert read(os.path.join('sub', 'c.txt')) == 'काम\n'
+    assert not os.path.exists(os.path.join(dest, 'd.bin'))
+
+    with open(os.path.join(dest, iscii_batch.MANIFEST_NAME)) as f:
+        files = json.load(f)['files']
+    assert files['a.isc']['script'] == 'devanagari'
+    # the script that the file starts in; its ATR switches to Tamil
+    assert files[os.path.join('sub', 'b.isc')]['script'] == 'devanagari'
+
+
+def test_text_before_atr(tmpdir):
+    src = tmpdir.join('src')
+    src.join('a.isc').write_binary(b'\xb3\xef\x44\xb3\n', ensure=True)
+    dest = tmpdir.join('dest')
+    iscii_batch.convert_tree(str(src), str(dest), processes=1)
+    assert dest.join('a.isc').read_binary().decode('utf-8') == 'कக\n'
+
+
+def test_dest_in_src(tmpdir):
+    src, _ = make_tree(tmpdir)
+    dest = os.path.join(src, 'out')
+    for _ in range(2):
+        counts = iscii_batch.convert_tree(src, dest, processes=1)
+    assert counts == {'unchanged': 3, 'failed': 1}
+    assert not os.path.exists(os.path.join(dest, 'out'))
+    assert sorted(os.listdir(dest)) == [iscii_batch.MANIFEST_NAME, 'a.isc',
+                                        'sub']
+
+
+def test_rerun(tmpdir):
+    src, dest = make_tree(tmpdir)
+    iscii_batch.convert_tree(src, dest, processes=1)
+    assert iscii_batch.convert_tree(src, dest, processes=1) == \
+        {'unchanged': 3, 'failed': 1}
+
+    # same content, new modification time
+    path = os.path.join(src, 'a.isc')
+    os.utime(path, (0, 0))
+    assert iscii_batch.convert_tree(src, dest, processes=1) == \
+        {'unchanged': 3, 'failed': 1}
+
+    with open(path, 'ab') as f:
+        f.write(b'\xb3')
+    assert iscii_batch.convert_tree(src, dest, processes=1) == \
+        {'converted': 1, 'unchanged': 2, 'failed': 1}
+    with open(os.path.join(dest, 'a.isc'), 'rb') as f:
+        assert f.read().decode('utf-8') == 'काम ।\nक'
+
+
+def test_script(tmpdir):
+    src, dest = make_tree(tmpdir)
+    # the script only applies to the ISCII files
+    assert iscii_batch.main([src, dest, '--script', 'telugu',
+                             '--processes', '1']) == 1
+    with open(os.path.join(dest, 'a.isc'), 'rb') as f:
+        assert f.read().decode('utf-8') == 'కామ ।\n'
+    with open(os.path.join(dest, 'sub', 'c.txt'), 'rb') as f:
+        assert f.read().decode('utf-8') == 'काम\n'
+    assert not os.path.exists(os.path.join(dest, 'd.bin'))
+    with open(os.path.join(dest, iscii_batch.MANIFEST_NAME)) as f:
+        files = json.load(f)['files']
+    assert files[os.path.join('sub', 'c.txt')]['status'] == 'copied'
+    assert files['d.bin']['status'] == 'failed'
+
+
+def test_errors(tmpdir):
+    src, dest = make_tree(tmpdir)
+    os.symlink(os.path.join(src, 'missing'), os.path.join(src, 'broken'))
+    counts = iscii_batch.convert_tree(src, dest, processes=1)
+    assert counts == {'converted': 2, 'copied': 1, 'failed': 2}
+    with open(os.path.join(dest, iscii_batch.MANIFEST_NAME)) as f:
+        files = json.load(f)['files']
+    assert files['broken']['error'].startswith('FileNotFoundError')
+
+    entry = iscii_batch.convert((os.path.join(src, 'missing'),
+                                 os.path.join(dest, 'missing'), None, None))
+    assert entry['status'] == 'failed'
+
+
+def test_checkpoint(tmpdir, monkeypatch):
+    src, dest = make_tree(tmpdir)
+    saved = []
+    save_manifest = iscii_batch.save_manifest
+
+    def save(path, script, files):
+        saved.append(sorted(files))
+        save_manifest(path, script, files)
+
+    monkeypatch.setattr(iscii_batch, 'CHECKPOINT_FILES', 1)
+    monkeypatch.setattr(iscii_batch, 'save_manifest', save)
+    iscii_batch.convert_tree(src, dest, processes=1)
+    # after each of the four files, and at the end
+    assert len(saved) == 5
+    assert saved[0] == ['a.isc']
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+    test
+    ~~~~
+
+    Tests for legacy_fonts.py, with a toy encoding
+
+    :license: BSD
+"""
+
+import pytest
+
+from indic_transliteration.legacy_fonts import FontEncoding
+
+
+TOY = FontEncoding('toy', {
+    'k': 'क', 'x': 'ख', 'r': 'र', 'm': 'म', 's': 'स', 'h': 'ह',
+    'f': 'ि', 'a': 'ा', 'd': '्', 'Z': 'र्',
+    0xA4: '।',
+    b'ks': 'क्ष',
+    'kks': 'ऋ',
+}, rules=[
+    ('(ि)((?:%(C)s्)*%(C)s)', r'\2\1'),
+    ('((?:%(C)s्)*%(C)s%(M)s*)र्', r'र्\1'),
+], classes={'C': '[क-ह]', 'M': '[ा-ौ]'})
+
+
+DECODED = [
+    (b'', ''),
+    (b'kam 1', 'काम 1'),
+    (b'fk', 'कि'),
+    # the i-matra moves past the whole cluster
+    (b'fsdh', 'स्हि'),
+    # reph moves before its cluster, after the i-matra is in place
+    (b'kaZ', 'र्का'),
+    (b'fkZ', 'र्कि'),
+    (b'fmdkZ', 'र्म्कि'),
+    # byte sequences, longest first
+    (b'ks kks', 'क्ष ऋ'),
+    (b'fks', 'क्षि'),
+    (b'\xa4\xa5', '।\xa5'),
+]
+
+
+@pytest.mark.parametrize('data', DECODED)
+def test_decode(data):
+    raw, text = data
+    assert TOY.decode(raw) == text
+
+
+def test_no_rules():
+    plain = FontEncoding('plain', {0x41: 'क'})
+    assert plain.decode(bytearray(b'AB')) == 'कB'
+    assert repr(plain) == "FontEncoding('plain')"
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+    test
+    ~~~~
+
+    Differential tests of little/transliterator.py against sanscript.py,
+    through the schemes of little.transliterator.sanscriptScheme()
+
+    :license: BSD
+"""
+
+import random
+import re
+
+import pytest
+
+from indic_transliteration import sanscript
+from indic_transliteration.little import transliterator
+
+
+TEXTS = {
+    'harvardkyoto': "dharmakSetre kurukSetre samavetA yuyutsavaH . "
+                    "mAmakAH pANDavAzcaiva kimakurvata saJjaya .. "
+                    "yogazcittavRttinirodhaH . tadA draSTuH svarUpe'vasthAnam",
+    'itrans': "dharmakShetre kurukShetre samavetA yuyutsavaH . "
+              "mAmakAH pANDavAshchaiva kimakurvata sa~njaya .. "
+              "yogashchittavRRittinirodhaH . tadA draShTuH svarUpe.avasthAnam",
+    'iast': "dharmakṣetre kurukṣetre samavetā yuyutsavaḥ . "
+            "māmakāḥ pāṇḍavāśchaiva kimakurvata sañjaya .. "
+            "yogaśchittavṛttinirodhaḥ . tadā draṣṭuḥ svarūpe'vasthānam",
+}
+
+#: Where the two engines differ, as ``(scheme, text, little, sanscript)``.
+DIFFERENCES = [
+    # sanscript ends a consonant with a virama before signs and symbols
+    ('harvardkyoto', 'kM', 'कं', 'क्ं'),
+    ('harvardkyoto', 'kH', 'कः', 'क्ः'),
+    ('harvardkyoto', 'k.', 'क।', 'क्।'),
+    ('itrans', 'k.a', 'कऽ', 'क्ऽ'),
+    ('iast', 'kOṃ', 'कॐ', 'क्ॐ'),
+    # sanscript's Devanagari digits are ASCII
+    ('itrans', '12', '१२', '12'),
+    ('devanagari', '१२', '12', '१२'),
+    # from Devanagari, little leaves out the implicit a
+    ('devanagari', 'राम', 'raam', 'raama'),
+]
+
+#: The signs and symbols before which little has no virama.
+SIGNS = 'ंःँ।॥ऽॐ'
+
+DEVANAGARI = sanscript.SCHEMES[sanscript.DEVANAGARI]
+
+#: A consonant without a vowel sign or virama, which has an implicit a.
+BARE_CONSONANT = re.compile('([%s])(?![%s])' % (
+    ''.join(c for c in DEVANAGARI['consonants'] if len(c) == 1),
+    ''.join(DEVANAGARI['marks'] + DEVANAGARI['virama'])))
+
+
+def scheme_map(_from, _to):
+    schemes = dict((name, transliterator.sanscriptScheme(name))
+                   for name in TEXTS)
+    schemes['devanagari'] = DEVANAGARI
+    return sanscript.SchemeMap(schemes[_from], schemes[_to])
+
+
+def little(text, _from, _to):
+    return transliterator.transliterate(text, _from, _to).decode('utf-8')
+
+
+@pytest.mark.parametrize('name', sorted(TEXTS))
+def test_to_devanagari(name):
+    text = TEXTS[name]
+    assert sanscript.transliterate(text, scheme_map=scheme_map(
+        name, 'devanagari')) == little(text, name, 'devanagari')
+
+
+@pytest.mark.parametrize('name', sorted(TEXTS))
+def test_random_to_devanagari(name):
+    scheme = transliterator._names[name.upper()]
+    keys = [key for key in scheme if not key.isdigit()]
+    keys += list(scheme.swapTable or {})
+    smap = scheme_map(name, 'devanagari')
+    rnd = random.Random(0)
+    for _ in range(1000):
+        text = ' '.join(''.join(rnd.choice(keys)
+                                for _ in range(rnd.randint(1, 4)))
+                        for _ in range(3))
+        expected = little(text, name, 'devanagari')
+        actual = sanscript.transliterate(text, scheme_map=smap)
+        # the only difference is the virama before signs
+        assert re.sub('्(?=[%s])' % SIGNS, '', actual) == expected, text
+
+
+@pytest.mark.parametrize('name', sorted(TEXTS))
+def test_random_from_devanagari(name):
+    chars = [c for group in ('vowels', 'marks', 'other', 'consonants',
+                             'virama', 'symbols')
+             for c in DEVANAGARI[group] if not c.isdigit()]
+    smap = scheme_map('devanagari', name)
+    rnd = random.Random(0)
+    for _ in range(1000):
+        text = ' '.join(''.join(rnd.choice(chars)
+                                for _ in range(rnd.randint(1, 4)))
+                        for _ in range(3))
+        expected = little(text, 'devanagari', name)
+        # the only difference is the implicit a, which little leaves out
+        actual = sanscript.transliterate(BARE_CONSONANT.sub('\\1्', text),
+                                         scheme_map=smap)
+        assert actual == expected, text
+
+
+@pytest.mark.parametrize('data', DIFFERENCES)
+def test_differences(data):
+    name, text, expected_little, expected_sanscript = data
+    _to = 'devanagari' if name != 'devanagari' else 'itrans'
+    assert little(text, name, _to) == expected_little
+    assert sanscript.transliterate(text, scheme_map=scheme_map(name, _to)) == \
+        expected_sanscript
+
+
+@pytest.mark.parametrize('text', ['x', 'GY', 'dny', 'kSh', 'j~n'])
+def test_swap_table(text):
+    assert sanscript.transliterate(text, scheme_map=scheme_map(
+        'itrans', 'devanagari')) == little(text, 'itrans', 'devanagari')
+
+
+def test_synonyms():
+    scheme = transliterator.sanscriptScheme('itrans')
+    assert sorted(scheme.synonym_map['.m']) == ['.n', 'M']
+    assert scheme['virama'] == ['']
+
+
+def test_not_devanagari():
+    with pytest.raises(ValueError):
+        transliterator.sanscriptScheme('iso9rus')
+    with pytest.raises(ValueError):
+        transliterator.sanscriptScheme('devanagari')
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+    test
+    ~~~~
+
+    Tests for little/transliterator.py
+
+    :license: BSD
+"""
+
+import concurrent.futures
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+from indic_transliteration.little import transliterator, transliterator_tam
+
+
+BLOCK = transliterator.CharacterBlock('TESTBLOCK', list(range(0x901, 0x905)))
+SCHEME = transliterator.TransliterationScheme(BLOCK.name, 'TESTSCHEME', {
+    'a': 0x901, 'b': 0x902, 'abc': 0x903, 'c': 0x904})
+
+
+@pytest.mark.parametrize('data', [
+    ('abc', 'ः'),
+    ('ab', 'ँं'),
+    # 'ab' starts a longer key but is not one: back up to 'a'
+    ('abx c', 'ँंx ऄ'),
+    ('abcabc', 'ःः'),
+])
+def test_longest_key(data):
+    text, expected = data
+    assert transliterator.transliterate(text, SCHEME, BLOCK) == \
+        expected.encode('utf-8')
+
+
+def test_next_char():
+    assert SCHEME._getNextChar('xabc', 1) == 'abc'
+    assert SCHEME._getNextChar('xab', 1) == 'a'
+    assert SCHEME._getNextChar('xab', 0) == 'x'
+
+
+def test_itrans():
+    assert transliterator.transliterate(
+        'yogashchittavRRittinirodhaH', 'itrans', 'devanagari') == \
+        'योगश्चित्तवृत्तिनिरोधः'.encode('utf-8')
+
+
+def test_options():
+    assert transliterator.transliterate('abx', SCHEME, BLOCK, {
+        'handleUnrecognised': transliterator.UNRECOGNISED_SUBSTITUTE,
+        'substituteChar': '_'}) == 'ँं_'.encode('utf-8')
+    with pytest.raises(KeyError):
+        transliterator.transliterate('abx', SCHEME, BLOCK, {
+            'handleUnrecognised': transliterator.UNRECOGNISED_FAIL})
+    # the defaults are left alone
+    assert transliterator.options == dict(transliterator.defaultOptions)
+
+
+def test_concurrent_options():
+    requests = [{}, {'outputASCIIEncoded': True}] * 20
+    text = 'abcab ' * 200
+
+    def run(requestOptions):
+        return transliterator.transliterate(text, SCHEME, BLOCK,
+                                            requestOptions)
+
+    expected = [run(r) for r in requests]
+    with concurrent.futures.ThreadPoolExecutor(8) as pool:
+        assert list(pool.map(run, requests)) == expected
+
+
+def test_swap_table():
+    scheme = transliterator.TransliterationScheme(
+        BLOCK.name, 'TESTSWAP', {'a': 0x901, 'b': 0x902, 'c': 0x903},
+        {'ab': 'c', 'abb': 'ba', 'c': 'a'})
+    # longest first, and replacements are not replaced again
+    assert scheme._preprocess('abbabc') == 'baca'
+    assert transliterator.transliterate('xaGYdnyx', 'itrans', 'devanagari') \
+        == 'क्षज्ञ्ज्ञ्क्ष्'.encode('utf-8')
+
+
+def test_compile():
+    convert = transliterator.compile('itrans', 'devanagari',
+                                     outputASCIIEncoded=True)
+    texts = ['abc', 'yogaH', '', 'x y']
+    expected = [transliterator.transliterate(text, 'itrans', 'devanagari',
+                                             {'outputASCIIEncoded': True})
+                for text in texts]
+    assert [convert(text) for text in texts] == expected
+    assert list(convert(iter(texts))) == expected
+    assert convert.options['outputASCIIEncoded']
+    assert not transliterator.options['outputASCIIEncoded']
+
+
+def test_compile_errors():
+    with pytest.raises(ValueError):
+        transliterator.compile('itrans', 'nosuchformat')
+    with pytest.raises(ValueError):
+        transliterator.compile('itrans', 'cyrillic')
+    with pytest.raises(TypeError):
+        transliterator.transliterate(None, 'itrans', 'devanagari')
+    # the same format on both sides is only checked
+    assert transliterator.compile(BLOCK, BLOCK)('ँ ं') == \
+        'ँ ं'.encode('utf-8')
+    with pytest.raises(KeyError):
+        transliterator.compile(BLOCK, BLOCK)('x')
+
+
+def test_transition_table():
+    hk = transliterator._names['HARVARDKYOTO']
+    table = hk._transitionTable(transliterator._names['DEVANAGARI'])
+    dev = transliterator._Devanagari
+    n = dev._NCLASSES
+    # a virama before consonants and at the end, not before vowels
+    assert table['k'][dev._NONE * n + dev._CONSONANT] == 'क्'
+    assert table['k'][dev._NONE * n + dev._NONE] == 'क्'
+    assert table['k'][dev._NONE * n + dev._VOWEL] == 'क'
+    # dependent vowels after consonants
+    assert table['A'][dev._CONSONANT * n + dev._NONE] == 'ा'
+    assert table['A'][dev._VOWEL * n + dev._NONE] == 'आ'
+    assert hk._transitionTable(transliterator._names['DEVANAGARI']) is table
+
+
+def test_lazy_formats():
+    # the built-in formats are only created when they are first used
+    code = """if True:
+        from indic_transliteration.little import (transliterator,
+                                                  transliterator_tam)
+        names = transliterator._names
+        assert set(names) == set(transliterator._loaders)
+        transliterator.transliterate('a', 'iast', 'devanagari')
+        loaded = set(names) - set(transliterator._loaders)
+        assert sorted(loaded) == ['DEVANAGARI', 'IAST']
+        """
+    subprocess.check_call([sys.executable, '-c', code],
+                          cwd=os.path.dirname(os.path.dirname(__file__)))
+    with pytest.raises(KeyError):
+        transliterator.characterBlocks['NOSUCHBLOCK']
+
+
+def test_registry():
+    # the formats that are not created yet count as keys too
+    names = transliterator._names
+    assert 'ISO9RUS' in names
+    assert 'NOSUCHFORMAT' not in names
+    assert 'CYRILLIC' in transliterator.characterBlocks
+    assert 'ISO9RUS' not in transliterator.characterBlocks
+    assert len(names) == len(list(names)) == len(names.keys())
+    assert set(names) >= {'DEVANAGARI', 'HARVARDKYOTO', 'HARVARDKYOTO_TAMIL',
+                          'ITRANS', 'IAST', 'CYRILLIC', 'ISO9RUS'}
+    assert names.get('NOSUCHFORMAT') is None
+    assert names.get('ISO9RUS').name == 'ISO9RUS'
+    assert dict(names.items())['IAST'] is names['IAST']
+
+
+def test_registry_failed_loader(monkeypatch):
+    calls = []
+
+    def loader():
+        calls.append(None)
+        raise RuntimeError('broken')
+
+    monkeypatch.setitem(transliterator._loaders, 'BROKEN', loader)
+    monkeypatch.setattr(transliterator._names, '_pending', {'BROKEN'})
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            transliterator._names['BROKEN']
+        assert 'BROKEN' in transliterator._names
+    assert len(calls) == 2
+
+
+def test_characters():
+    block = transliterator.characterBlocks['DEVANAGARI']
+    assert block['\u0915'].name == 'DEVANAGARI LETTER KA'
+    # dependent vowels are variants of the standalone vowels
+    assert block['\u093e'] is block['\u0906']
+    assert block['\u0906']._dependentVowel == '\u093e'
+    assert not hasattr(block['\u0915'], '__dict__')
+
+
+@pytest.mark.parametrize('processes', ['1', '2'])
+def test_main(tmpdir, processes):
+    src = tmpdir.join('in.txt')
+    src.write_text('rAma\n# a comment\n\nkRSNa\n' * 3, encoding='utf-8')
+    dest = tmpdir.join('out.txt')
+    assert transliterator.main(['transliterator', str(src), 'harvardkyoto',
+                                'devanagari', '-o', str(dest),
+                                '-j', processes]) == 0
+    assert dest.read_text(encoding='utf-8') == 'राम\n\nकृष्ण\n' * 3
+
+
+def test_main_text(tmpdir):
+    dest = tmpdir.join('out.txt')
+    transliterator.main(['transliterator', 'rAma kRSNa', 'harvardkyoto',
+                         'devanagari', '--output', str(dest)])
+    assert dest.read_text(encoding='utf-8') == 'राम कृष्ण\n'
+
+
+def test_main_comments(tmpdir, monkeypatch):
+    # only files have comments
+    dest = tmpdir.join('out.txt')
+    transliterator.main(['transliterator', '# rAma', 'harvardkyoto',
+                         'devanagari', '-o', str(dest)])
+    assert dest.read_text(encoding='utf-8') == '# राम\n'
+    monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BytesIO(
+        b'# rAma\nkRSNa\n')))
+    transliterator.main(['transliterator', 'harvardkyoto', 'devanagari',
+                         '-o', str(dest)])
+    assert dest.read_text(encoding='utf-8') == '# राम\nकृष्ण\n'
+
+
+def test_main_stdin(tmpdir, monkeypatch):
+    # stdin is left open, so main can read it again
+    stdin = io.TextIOWrapper(io.BytesIO(b'rAma\n'))
+    monkeypatch.setattr(sys, 'stdin', stdin)
+    dest = tmpdir.join('out.txt')
+    for i in range(2):
+        transliterator.main(['transliterator', 'harvardkyoto', 'devanagari',
+                             '-o', str(dest)])
+        assert not stdin.buffer.closed
+        assert dest.read_text(encoding='utf-8') == 'राम\n'
+        stdin.buffer.seek(0)
+
+
+def test_one_to_one():
+    text = 'Мороз и солнце;\nчудесный вечер!'
+    iso = transliterator.transliterate(text, 'cyrillic', 'iso9rus')
+    # whitespace is not doubled
+    assert iso.decode('utf-8') == 'Moroz i solnce;\nčudesnyj večer!'
+    assert transliterator.transliterate(iso.decode('utf-8'), 'iso9rus',
+                                        'cyrillic') == text.encode('utf-8')
+
+
+def test_one_to_one_unrecognised():
+    scheme = transliterator.TransliterationScheme(
+        BLOCK.name, 'TESTSINGLE', {'a': 0x901, 'b': 0x902})
+    substitute = {'handleUnrecognised': transliterator.UNRECOGNISED_SUBSTITUTE,
+                  'substituteChar': '_'}
+    fail = {'handleUnrecognised': transliterator.UNRECOGNISED_FAIL}
+    assert transliterator.transliterate('ab x]a', scheme, BLOCK) == \
+        'ँं x]ँ'.encode('utf-8')
+    assert transliterator.transliterate('ab x]a', scheme, BLOCK,
+                                        substitute) == 'ँं __ँ'.encode('utf-8')
+    with pytest.raises(KeyError) as e:
+        transliterator.transliterate('ab x]a', scheme, BLOCK, fail)
+    assert e.value.args == ('x',)
+    assert transliterator.transliterate('ँ ःx', BLOCK, scheme,
+                                        substitute) == b'a __'
+
+
+def test_variant():
+    variant = SCHEME.variant('TESTVARIANT', {'abc': None, 'c': 0x903})
+    assert sorted(variant) == ['a', 'b', 'c']
+    # the characters are shared
+    assert variant['a'] is SCHEME['a']
+    assert transliterator.transliterate('abc', variant, BLOCK) == \
+        'ँंः'.encode('utf-8')
+    assert transliterator.transliterate('abc', SCHEME, BLOCK) == \
+        'ः'.encode('utf-8')
+
+
+def test_tamil():
+    assert transliterator.transliterate('pe po', 'harvardkyoto_tamil',
+                                        'devanagari') == \
+        'पे पो'.encode('utf-8')
+    assert transliterator_tam.transliterate('pe po', 'harvardkyoto',
+                                            'devanagari') == \
+        'पे पो'.encode('utf-8')
+    assert transliterator.transliterate('pe po', 'harvardkyoto',
+                                        'devanagari') == \
+        'पॆ पॊ'.encode('utf-8')
+    convert = transliterator_tam.compile('devanagari', 'harvardkyoto')
+    assert convert('पे पो') == b'pe po'
+
+
+def test_tamil_main(tmpdir):
+    dest = tmpdir.join('out.txt')
+    assert transliterator_tam.main(['transliterator_tam', 'pe po',
+                                    'harvardkyoto', 'devanagari',
+                                    '-o', str(dest)]) == 0
+    assert dest.read_text(encoding='utf-8') == 'पे पो\n'
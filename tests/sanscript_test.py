@@ -8,8 +8,9 @@ Tests Sanskrit transliteration.
 :license: MIT and BSD
 """
 
-from __future__ import unicode_literals
+from __future__ import print_function, unicode_literals
 
+from indic_transliteration import detect
 from indic_transliteration import sanscript as S
 
 import unittest
@@ -175,7 +176,7 @@ class GeneralTestCase(SanscriptTestCase):
     groups = set(dev.keys())
     for name, scheme in S.SCHEMES.items():
       for group in scheme:
-        print name, group
+        print(name, group)
         self.assertIn(group, groups)
         self.assertEqual(len(scheme[group]), len(dev[group]))
 
@@ -201,11 +202,52 @@ class ItransSynonymsTestCase(SanscriptTestCase):
 
   def test_devanaagarii_equivalence(self):
     """Test all synonmous transliterations."""
-    print S.transliterate("rAmo gUDhaM vaktI~Ngitaj~naH kShetre", S.ITRANS, S.DEVANAGARI),
+    print(S.transliterate("rAmo gUDhaM vaktI~Ngitaj~naH kShetre", S.ITRANS, S.DEVANAGARI), end=' ')
     self.assertEqual(S.transliterate("rAmo gUDhaM vaktI~Ngitaj~naH kShetre", S.ITRANS, S.DEVANAGARI),
                      S.transliterate("raamo guuDhaM vaktii~NgitaGYaH xetre", S.ITRANS, S.DEVANAGARI))
 
 
+class AutoTestCase(SanscriptTestCase):
+  """Test transliteration from a detected scheme."""
+
+  def test_auto(self):
+    """Test that AUTO matches the explicit source scheme."""
+    for _from in [S.DEVANAGARI, S.BENGALI, S.HK, S.IAST, S.SLP1]:
+      source = DATA[_from]['sentence']
+      self.assertEqual(S.transliterate(source, S.AUTO, S.DEVANAGARI),
+                       S.transliterate(source, _from, S.DEVANAGARI))
+
+  def test_auto_detected(self):
+    """Test AUTO for every scheme that detect can return."""
+    samples = {
+      detect.Scheme.Bengali: 'রাম', detect.Scheme.Devanagari: 'राम',
+      detect.Scheme.Gujarati: 'રામ', detect.Scheme.Gurmukhi: 'ਰਾਮ',
+      detect.Scheme.Kannada: 'ರಾಮ', detect.Scheme.Malayalam: 'രാമ',
+      detect.Scheme.Oriya: 'ରାମ', detect.Scheme.Tamil: 'ராம',
+      detect.Scheme.Telugu: 'రామ', detect.Scheme.HK: 'rAmaH',
+      detect.Scheme.IAST: 'rāmaḥ', detect.Scheme.ITRANS: 'raamaH',
+      detect.Scheme.SLP1: 'kfta', detect.Scheme.Kolkata: 'kēśava',
+      detect.Scheme.Velthuis: 'k.r.s.na',
+    }
+    self.assertEqual(set(samples), set(S._DETECTED_SCHEMES))
+    for scheme, source in samples.items():
+      self.assertEqual(detect.detect(source), scheme)
+      _from = S._DETECTED_SCHEMES[scheme]
+      if _from in S.SCHEMES:
+        self.assertEqual(S.transliterate(source, S.AUTO, S.DEVANAGARI),
+                         S.transliterate(source, _from, S.DEVANAGARI))
+      else:
+        self.assertRaises(ValueError, S.transliterate, source, S.AUTO,
+                          S.DEVANAGARI)
+
+  def test_cached_scheme_map(self):
+    """Test that repeated AUTO calls reuse one scheme map."""
+    S.transliterate('nara iti', S.AUTO, S.DEVANAGARI)
+    scheme_map = S._auto_scheme_maps[(S.HK, S.DEVANAGARI)][2]
+    S.transliterate('putra', S.AUTO, S.DEVANAGARI)
+    self.assertIs(scheme_map, S._auto_scheme_maps[(S.HK, S.DEVANAGARI)][2])
+
+
 class BrahmicTestCase(SanscriptTestCase):
   """Test transliteration from a Brahmic scheme."""
 